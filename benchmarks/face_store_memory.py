@@ -0,0 +1,73 @@
+import time
+import tracemalloc
+from windows_fonts import CharacterSet, FontCatalogEntry, FontFaceStore
+from pathlib import Path
+from typing import Tuple
+
+# Measure how many bytes a face cost in FontFaceStore, without the fixed cost of an empty store.
+# Run with: python benchmarks/face_store_memory.py
+# With tracemalloc on CPython 3.11: 86.7 bytes/face at 10k, 100.5 at 100k and 93.3 at 1M faces.
+# The 100k and 1M numbers depend on where the array columns are in their over-allocation.
+
+STYLES = ["Regular", "Italic", "Bold", "Bold Italic", "Light", "Light Italic", "Black", "Black Italic"]
+DIRECTORIES = [Path("C:/Windows/Fonts"), Path("C:/Users/user/AppData/Local/Microsoft/Windows/Fonts"), Path("D:/Fonts")]
+CHARSET_MASKS = [
+    FontCatalogEntry.get_charset_bit(CharacterSet.ANSI_CHARSET),
+    FontCatalogEntry.get_charset_bit(CharacterSet.ANSI_CHARSET) | FontCatalogEntry.get_charset_bit(CharacterSet.RUSSIAN_CHARSET) | FontCatalogEntry.get_charset_bit(CharacterSet.GREEK_CHARSET),
+    FontCatalogEntry.get_charset_bit(CharacterSet.SHIFTJIS_CHARSET),
+]
+
+
+def build_store(face_count: int) -> FontFaceStore:
+    store = FontFaceStore()
+    for i in range(face_count):
+        family_name = f"Synthetic Family {i // len(STYLES)}"
+        style = STYLES[i % len(STYLES)]
+        store.append(
+            family_name,
+            style,
+            f"{family_name} {style}",
+            DIRECTORIES[i % len(DIRECTORIES)] / f"synthetic{i // len(STYLES)}-{style.replace(' ', '')}.ttf",
+            0,
+            700 if "Bold" in style else 400,
+            "Italic" in style,
+            0x22,
+            4,
+            CHARSET_MASKS[i % len(CHARSET_MASKS)],
+        )
+    return store
+
+
+def trace_build(face_count: int) -> Tuple[FontFaceStore, int, float]:
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    store = build_store(face_count)
+    build_time = time.perf_counter() - start_time
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (store, memory, build_time)
+
+
+def main():
+    # The first build allocate what doesn't depend on the number of faces (the empty columns and pools, the interned
+    # charset masks, the caches of the interpreter). It is subtracted, so the small stores aren't overestimated.
+    build_store(100)
+    _, fixed_memory, _ = trace_build(0)
+
+    for face_count in (10_000, 100_000, 1_000_000):
+        store, memory, build_time = trace_build(face_count)
+        memory -= fixed_memory
+
+        start_time = time.perf_counter()
+        matches = store.find(weight=700, is_italic=True, charset=CharacterSet.RUSSIAN_CHARSET)
+        find_time = time.perf_counter() - start_time
+
+        print(
+            f"{face_count:>9} faces: {memory / face_count:6.1f} bytes/face (tracemalloc), "
+            f"{store.get_memory_usage() / face_count:6.1f} bytes/face (get_memory_usage), "
+            f"build {build_time:.2f}s (traced), find {find_time * 1000:.1f}ms ({len(matches)} matches)"
+        )
+
+
+if __name__ == "__main__":
+    main()
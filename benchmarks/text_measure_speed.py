@@ -0,0 +1,31 @@
+import random
+import sys
+import time
+from windows_fonts import TextMeasurer
+from pathlib import Path
+
+# Measure how long it take to check every line of a subtitle script against a safe area.
+# Run with: python benchmarks/text_measure_speed.py [font path]
+
+FONT_PATH = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent.parent / "tests" / "AliviaRegular_Weight31961.ttf"
+ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 ,.!?'-"
+
+
+def main():
+    random.seed(0)
+    lines = ["".join(random.choice(ALPHABET) for _ in range(random.randint(10, 80))) for _ in range(10_000)]
+
+    with TextMeasurer() as measurer:
+        start_time = time.perf_counter()
+        overflowing = measurer.find_overflowing_lines(FONT_PATH, lines, 48, 1600)
+        cold_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        measurer.find_overflowing_lines(FONT_PATH, lines, 48, 1600)
+        warm_time = time.perf_counter() - start_time
+
+    print(f"{len(lines)} lines: cold {cold_time * 1000:.1f}ms, warm {warm_time * 1000:.1f}ms ({len(overflowing)} overflowing)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import sys
+
+# These tests only use the GDI and DirectWrite bindings, which only exist on Windows
+collect_ignore = [] if sys.platform == "win32" else [
+    "test_cli.py",
+    "test_handles.py",
+    "test_lfPitchAndFamily.py",
+]
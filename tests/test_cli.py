@@ -0,0 +1,48 @@
+import json
+import os
+from io import StringIO
+from pathlib import Path
+from windows_fonts.cli import DEFAULT_FLUSH_LINES, get_default_flush_lines, JsonLinesWriter, main, run, Stats
+
+
+def test_run_streams_results_and_errors():
+    def handler(query):
+        if query["family_name"] == "error":
+            raise ValueError("invalid family")
+        return {"path": query["family_name"]}
+
+    input_stream = StringIO('{"id": 1, "family_name": "Arial"}\n\n{"id": 2, "family_name": "error"}\nnot json\n')
+    output_stream = StringIO()
+    stats = Stats()
+
+    run(handler, input_stream, JsonLinesWriter(output_stream, 1), stats)
+
+    results = [json.loads(line) for line in output_stream.getvalue().splitlines()]
+    assert results[0] == {"id": 1, "path": "Arial"}
+    assert results[1] == {"id": 2, "error": "ValueError: invalid family"}
+    assert "error" in results[2]
+    assert stats.queries == 3
+    assert stats.errors == 2
+
+
+def test_main_resolve():
+    stdin = StringIO('{"id": "arial", "family_name": "Arial", "weight": 700}\n')
+    stdout = StringIO()
+    stderr = StringIO()
+
+    assert main(["resolve", "--stats"], stdin, stdout, stderr) == 0
+
+    result = json.loads(stdout.getvalue())
+    assert result["id"] == "arial"
+    assert Path(result["path"]).name.lower() == "arialbd.ttf"
+    assert "queries=1" in stderr.getvalue()
+
+
+def test_default_flush_lines(tmp_path: Path):
+    with open(tmp_path / "results.jsonl", "w") as file:
+        assert get_default_flush_lines(file) == DEFAULT_FLUSH_LINES
+
+    # An interactive client read the results through a pipe
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd) as read_stream, os.fdopen(write_fd, "w") as write_stream:
+        assert get_default_flush_lines(write_stream) == 1
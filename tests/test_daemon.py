@@ -0,0 +1,101 @@
+import pytest
+import threading
+from windows_fonts import (
+    CharacterSet,
+    FontBackend,
+    FontCatalog,
+    FontCatalogEntry,
+    FontDaemon,
+    FontDaemonClient,
+    FontDaemonError,
+    get_daemon_address,
+    LoopbackBackend,
+)
+from pathlib import Path
+from uuid import uuid4
+
+
+def create_daemon() -> FontDaemon:
+    regular = FontCatalogEntry("Alivia", "Alivia Regular", "Regular", 400, False, 0, 4, FontCatalogEntry.get_charset_bit(CharacterSet.ANSI_CHARSET))
+    bold = FontCatalogEntry("Alivia", "Alivia Bold", "Bold", 700, False, 0, 4, FontCatalogEntry.get_charset_bit(CharacterSet.ANSI_CHARSET))
+    backend = LoopbackBackend(
+        FontCatalog([regular, bold]),
+        {"Alivia Regular": Path("alivia.ttf"), "Alivia Bold": Path("aliviabd.ttf")},
+        {"Alivia Regular": "abc"},
+    )
+    daemon = FontDaemon(backend, get_daemon_address(f"windows-fonts-test-{uuid4()}"))
+    daemon.start()
+    return daemon
+
+
+def test_daemon_requests():
+    with create_daemon() as daemon:
+        with FontDaemonClient(daemon.address) as client:
+            assert client.resolve("alivia") == Path("alivia.ttf")
+            assert client.resolve("Alivia", 700) == Path("aliviabd.ttf")
+            assert [entry.full_name for entry in client.enumerate("Alivia")] == ["Alivia Regular", "Alivia Bold"]
+            assert client.coverage("Alivia", "abcd") == "d"
+
+            with pytest.raises(FontDaemonError):
+                client.resolve("Arial")
+
+
+def test_daemon_pipeline():
+    with create_daemon() as daemon:
+        with FontDaemonClient(daemon.address) as client:
+            requests = [("resolve", {"family_name": "Alivia", "weight": 400 + i % 2 * 300}) for i in range(1000)]
+            requests.append(("unknown", {}))
+
+            results = client.pipeline(requests, window=16)
+
+            assert results[:2] == ["alivia.ttf", "aliviabd.ttf"]
+            assert len(results) == 1001
+            assert isinstance(results[-1], FontDaemonError)
+
+
+def test_daemon_refresh():
+    class RefreshCountingBackend(LoopbackBackend):
+        def __init__(self) -> None:
+            super().__init__(FontCatalog([]), {})
+            self.refresh_count = 0
+
+        def refresh(self, params):
+            self.refresh_count += 1
+
+    backend = RefreshCountingBackend()
+    with FontDaemon(backend, get_daemon_address(f"windows-fonts-test-{uuid4()}")) as daemon:
+        daemon.start()
+        with FontDaemonClient(daemon.address) as client:
+            client.refresh()
+            assert client.enumerate("Alivia") == []
+    assert backend.refresh_count == 1
+
+
+def test_backend_must_implement_every_method():
+    class ResolveOnlyBackend(FontBackend):
+        def resolve(self, params):
+            return "alivia.ttf"
+
+    with pytest.raises(TypeError):
+        ResolveOnlyBackend()
+
+
+def close_in_thread(daemon: FontDaemon) -> bool:
+    thread = threading.Thread(target=daemon.close, daemon=True)
+    thread.start()
+    thread.join(10)
+    return not thread.is_alive()
+
+
+def test_daemon_close_with_authkey():
+    backend = LoopbackBackend(FontCatalog([]), {})
+
+    # Never started
+    daemon = FontDaemon(backend, get_daemon_address(f"windows-fonts-test-{uuid4()}"), authkey=b"secret")
+    assert close_in_thread(daemon)
+
+    daemon = FontDaemon(backend, get_daemon_address(f"windows-fonts-test-{uuid4()}"), authkey=b"secret")
+    daemon.start()
+    with FontDaemonClient(daemon.address, authkey=b"secret") as client:
+        assert client.enumerate("Alivia") == []
+    assert close_in_thread(daemon)
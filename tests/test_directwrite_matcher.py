@@ -0,0 +1,72 @@
+import os
+from windows_fonts import (
+    DirectWriteFontMatcher,
+    DWRITE_FONT_FAMILY_MODEL,
+    DWRITE_FONT_SIMULATIONS,
+    DWRITE_FONT_STYLE,
+    FontFace,
+)
+from pathlib import Path
+from fontTools.ttLib.ttFont import TTFont
+
+
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+TRUETYPE_31961_FONT_PATH = Path(os.path.join(DIR_PATH, "AliviaRegular_Weight31961.ttf"))
+
+
+def save_face(directory: Path, filename: str, weight: int, is_italic: bool = False, wws_family_name: str = "") -> Path:
+    ttfont = TTFont(TRUETYPE_31961_FONT_PATH)
+    ttfont["OS/2"].usWeightClass = weight
+    ttfont["OS/2"].fsSelection &= ~(1 << 0)
+    if is_italic:
+        ttfont["OS/2"].fsSelection |= 1 << 0
+    ttfont["name"].setName(filename, 4, 3, 1, 0x409)
+    if wws_family_name:
+        ttfont["name"].setName(wws_family_name, 21, 3, 1, 0x409)
+
+    path = directory / f"{filename}.ttf"
+    ttfont.save(path)
+    return path
+
+
+def test_font_face_from_file():
+    face, = FontFace.from_file(TRUETYPE_31961_FONT_PATH)
+
+    assert face.family_name == "Alivia"
+    assert face.weight == 31961
+    assert not face.is_italic
+
+
+def test_match_weight_and_style(tmp_path: Path):
+    regular = save_face(tmp_path, "regular", 400)
+    bold = save_face(tmp_path, "bold", 700)
+    italic = save_face(tmp_path, "italic", 400, True)
+    matcher = DirectWriteFontMatcher.from_files([regular, bold, italic])
+
+    match = matcher.match("ALIVIA", 700)
+    assert match.face.path == bold
+    assert match.simulations == DWRITE_FONT_SIMULATIONS.DWRITE_FONT_SIMULATIONS_NONE
+    assert "lost" in match.reasons[-1]
+
+    match = matcher.match("Alivia", style=DWRITE_FONT_STYLE.DWRITE_FONT_STYLE_ITALIC)
+    assert match.face.path == italic
+    assert match.simulations == DWRITE_FONT_SIMULATIONS.DWRITE_FONT_SIMULATIONS_NONE
+
+    match = matcher.match("Alivia", 900)
+    assert match.face.path == bold
+    assert match.simulations == DWRITE_FONT_SIMULATIONS.DWRITE_FONT_SIMULATIONS_BOLD
+
+    assert matcher.match("Arial") is None
+
+
+def test_wws_family(tmp_path: Path):
+    regular = save_face(tmp_path, "regular", 400)
+    other = save_face(tmp_path, "other", 400, wws_family_name="Alivia Other")
+
+    wws_matcher = DirectWriteFontMatcher.from_files([regular, other])
+    assert wws_matcher.match("Alivia Other").face.path == other
+    assert len(wws_matcher.find_family_name("Alivia").faces) == 1
+
+    typographic_matcher = DirectWriteFontMatcher.from_files([regular, other], DWRITE_FONT_FAMILY_MODEL.DWRITE_FONT_FAMILY_MODEL_TYPOGRAPHIC)
+    assert typographic_matcher.match("Alivia Other") is None
+    assert len(typographic_matcher.find_family_name("Alivia").faces) == 2
@@ -0,0 +1,75 @@
+import os
+from windows_fonts import CharacterSet, FontCatalog, FontCatalogEntry, FontFace, FontFaceStore, IndexSnapshot
+from pathlib import Path
+from fontTools.ttLib.ttFont import TTFont
+
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+TRUETYPE_31961_FONT_PATH = Path(os.path.join(DIR_PATH, "AliviaRegular_Weight31961.ttf"))
+
+
+def test_append_and_rows():
+    store = FontFaceStore()
+    store.append("Alivia", "Regular", "Alivia", Path("C:/Windows/Fonts/alivia.ttf"), 0, 400, False)
+    store.append("ALIVIA", "Bold Italic", "Alivia Bold Italic", Path("C:/Windows/Fonts/aliviabi.ttf"), 0, 700, True)
+    store.append("Other", "Regular", "Other Font", None, 2, 400, False, charset_mask=FontCatalogEntry.get_charset_bit(CharacterSet.HANGUL_CHARSET))
+
+    assert len(store) == 3
+    assert len(store.family_names) == 2
+    assert store[0].full_name == "Alivia"
+    assert store[1].family_name == "Alivia"
+    assert store[1].full_name == "Alivia Bold Italic"
+    assert store[1].path == Path("C:/Windows/Fonts/aliviabi.ttf")
+    assert store[2].full_name == "Other Font"
+    assert store[2].path is None
+    assert store[2].face_index == 2
+    assert store[2].charsets == [CharacterSet.HANGUL_CHARSET]
+
+
+def test_find():
+    store = FontFaceStore()
+    store.add_catalog(FontCatalog([
+        FontCatalogEntry("Alivia", "Alivia", "Regular", 400, False, 0, 4, FontCatalogEntry.get_charset_bit(CharacterSet.ANSI_CHARSET)),
+        FontCatalogEntry("Alivia", "Alivia Bold", "Bold", 700, False, 0, 4, FontCatalogEntry.get_charset_bit(CharacterSet.ANSI_CHARSET) | FontCatalogEntry.get_charset_bit(CharacterSet.GREEK_CHARSET)),
+    ]))
+
+    assert [row.full_name for row in store.find(family_name="alivia")] == ["Alivia", "Alivia Bold"]
+    assert [row.full_name for row in store.find(charset=CharacterSet.GREEK_CHARSET)] == ["Alivia Bold"]
+    assert store.find(weight=700, is_italic=True) == []
+    assert store.find(family_name="Arial") == []
+    assert store[1].to_catalog_entry().charset_mask == store.charset_masks[1]
+
+
+def test_more_than_65535_masks(tmp_path: Path):
+    store = FontFaceStore()
+    for i in range(70_000):
+        store.append(f"Family {i}", "Regular", f"Family {i}", None, 0, 400, False, unicode_ranges=i << 32)
+
+    assert len(store.unicode_ranges) == 70_000
+    assert store[69_999].unicode_ranges == 69_999 << 32
+    assert [row.family_name for row in store.find(unicode_range=32 + 16)] == [f"Family {i}" for i in range(1 << 16, 70_000)]
+
+    IndexSnapshot.write(store, tmp_path / "index.bin")
+    with IndexSnapshot(tmp_path / "index.bin") as snapshot:
+        assert snapshot.find("Family 69999")[0].unicode_ranges == 69_999 << 32
+
+
+def test_charsets_from_os2(tmp_path: Path):
+    ttfont = TTFont(TRUETYPE_31961_FONT_PATH)
+    ttfont["OS/2"].usWeightClass = 700
+    ttfont["OS/2"].ulCodePageRange1 = (1 << 0) | (1 << 19)
+    # Hangul Syllables
+    ttfont["OS/2"].ulUnicodeRange2 |= 1 << (56 - 32)
+    hangul_path = tmp_path / "hangul.ttf"
+    ttfont.save(hangul_path)
+
+    face, = FontFace.from_file(TRUETYPE_31961_FONT_PATH)
+    assert face.charsets == [CharacterSet.ANSI_CHARSET, CharacterSet.EASTEUROPE_CHARSET]
+    assert face.supports_unicode_range(0)
+    assert not face.supports_unicode_range(56)
+
+    store = FontFaceStore()
+    store.add_files([TRUETYPE_31961_FONT_PATH, hangul_path])
+    assert [row.path for row in store.find(charset=CharacterSet.HANGUL_CHARSET, min_weight=700)] == [hangul_path]
+    assert [row.path for row in store.find(unicode_range=56)] == [hangul_path]
+    assert store.find(charset=CharacterSet.HANGUL_CHARSET, max_weight=400) == []
+    assert len(store.find(charset=CharacterSet.ANSI_CHARSET)) == 2
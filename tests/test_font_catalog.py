@@ -0,0 +1,114 @@
+import os
+import pytest
+import sys
+from windows_fonts import CharacterSet, FontCatalog, FontCatalogEntry
+from pathlib import Path
+from fontTools.ttLib.ttFont import TTFont
+
+if sys.platform == "win32":
+    from windows_fonts import WindowsFonts
+
+
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+TRUETYPE_31961_FONT_PATH = Path(os.path.join(DIR_PATH, "AliviaRegular_Weight31961.ttf"))
+
+
+def create_entry(full_name: str, weight: int = 400, is_italic: bool = False, charset: CharacterSet = CharacterSet.ANSI_CHARSET) -> FontCatalogEntry:
+    return FontCatalogEntry("Alivia", full_name, "Regular", weight, is_italic, 0, 4, FontCatalogEntry.get_charset_bit(charset))
+
+
+def test_collapse_charsets():
+    catalog = FontCatalog.collapse([
+        create_entry("Alivia Regular", charset=CharacterSet.ANSI_CHARSET),
+        create_entry("Alivia Regular", charset=CharacterSet.RUSSIAN_CHARSET),
+        create_entry("Alivia Bold", weight=700),
+    ])
+
+    assert len(catalog) == 2
+    regular = catalog.find(weight=400)[0]
+    assert regular.charsets == [CharacterSet.ANSI_CHARSET, CharacterSet.RUSSIAN_CHARSET]
+    assert catalog.find(family_name="ALIVIA", charset=CharacterSet.RUSSIAN_CHARSET) == [regular]
+    assert catalog.find(is_italic=True) == []
+    assert catalog.get_family_names() == ["Alivia"]
+
+
+def test_diff():
+    previous = FontCatalog.collapse([
+        create_entry("Alivia Regular"),
+        create_entry("Alivia Bold", weight=700),
+    ])
+    current = FontCatalog.collapse([
+        create_entry("Alivia Regular"),
+        create_entry("Alivia Regular", charset=CharacterSet.GREEK_CHARSET),
+        create_entry("Alivia Italic", is_italic=True),
+    ])
+
+    diff = current.diff(previous)
+    assert [entry.full_name for entry in diff.added] == ["Alivia Italic"]
+    assert [entry.full_name for entry in diff.removed] == ["Alivia Bold"]
+    assert len(diff.changed) == 1
+    assert diff.changed[0][1].supports_charset(CharacterSet.GREEK_CHARSET)
+    assert not current.diff(current)
+
+
+def test_save_load(tmp_path: Path):
+    catalog = FontCatalog.collapse([create_entry("Alivia Regular"), create_entry("Alivia Bold", weight=700)])
+    catalog_path = tmp_path / "catalog.json"
+
+    catalog.save(catalog_path)
+
+    assert not FontCatalog.load(catalog_path).diff(catalog)
+
+
+def test_fingerprint(tmp_path: Path):
+    first_path = tmp_path / "first" / "alivia.ttf"
+    second_path = tmp_path / "second" / "alivia.ttf"
+    for path in (first_path, second_path):
+        path.parent.mkdir()
+        path.write_bytes(TRUETYPE_31961_FONT_PATH.read_bytes())
+
+    regular = create_entry("Alivia Regular")
+    bold = create_entry("Alivia Bold", weight=700)
+    first = FontCatalog([regular.with_file(first_path), bold.with_file(first_path)])
+    catalog_path = tmp_path / "catalog.json"
+    first.save(catalog_path)
+    assert FontCatalog.load(catalog_path).get_fingerprint() == first.get_fingerprint()
+
+    # Two machines with the same faces at other paths
+    second = FontCatalog([regular.with_file(second_path), bold.with_file(second_path)])
+    assert not second.diff(first)
+    assert second.get_fingerprint() != first.get_fingerprint()
+
+    # The same faces, enumerated in another order
+    reordered = FontCatalog([bold.with_file(first_path), regular.with_file(first_path)])
+    assert reordered.get_fingerprint() != first.get_fingerprint()
+
+    # Another version of the file
+    first_path.write_bytes(TRUETYPE_31961_FONT_PATH.read_bytes() + b"\0")
+    updated = FontCatalog([regular.with_file(first_path), bold.with_file(first_path)])
+    assert updated.get_fingerprint() != first.get_fingerprint()
+
+
+@pytest.mark.skipif(sys.platform != "win32", reason="GDI is only available on Windows")
+def test_snapshot_catalog_install(tmp_path: Path):
+    font_path = tmp_path / "alivia.ttf"
+    ttfont = TTFont(TRUETYPE_31961_FONT_PATH)
+    ttfont.save(font_path)
+
+    installed = False
+    try:
+        before = WindowsFonts.snapshot_catalog()
+        assert before.find(family_name="Alivia") == []
+
+        WindowsFonts.install_fonts(font_path)
+        installed = True
+        after = WindowsFonts.snapshot_catalog()
+
+        diff = after.diff(before)
+        assert len(diff.added) == 1
+        assert diff.added[0].family_name == "Alivia"
+        assert not diff.removed
+    finally:
+        # uninstall_fonts() raise when the font isn't installed, which would hide the failure
+        if installed:
+            WindowsFonts.uninstall_fonts(font_path)
@@ -0,0 +1,57 @@
+import os
+import shutil
+from windows_fonts import FontDeduplication
+from pathlib import Path
+from fontTools.ttLib.ttFont import TTFont
+
+
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+TRUETYPE_31961_FONT_PATH = Path(os.path.join(DIR_PATH, "AliviaRegular_Weight31961.ttf"))
+
+
+def test_scan_and_hardlink(tmp_path: Path):
+    # The scanned paths are resolved
+    tmp_path = tmp_path.resolve()
+    first_directory = tmp_path / "first"
+    second_directory = tmp_path / "second" / "nested"
+    first_directory.mkdir()
+    second_directory.mkdir(parents=True)
+
+    original_path = first_directory / "alivia.ttf"
+    copy_path = second_directory / "copy of alivia.TTF"
+    shutil.copyfile(TRUETYPE_31961_FONT_PATH, original_path)
+    shutil.copyfile(TRUETYPE_31961_FONT_PATH, copy_path)
+
+    # Same size, but a different content
+    modified = TTFont(TRUETYPE_31961_FONT_PATH)
+    modified["OS/2"].usWeightClass = 700
+    modified_path = second_directory / "alivia bold.ttf"
+    modified.save(modified_path)
+    (second_directory / "readme.txt").write_text("not a font")
+
+    deduplication = FontDeduplication.scan([first_directory, tmp_path / "second"])
+
+    assert len(deduplication.groups) == 1
+    assert deduplication.groups[0].paths == [original_path, copy_path]
+    assert deduplication.get_canonical_path(copy_path) == original_path
+    assert deduplication.get_canonical_path(modified_path) == modified_path
+    assert sorted(deduplication.get_unique_paths()) == sorted([original_path, modified_path])
+
+    assert deduplication.hardlink_duplicates() == 1
+    assert os.path.samefile(original_path, copy_path)
+    assert deduplication.hardlink_duplicates() == 0
+
+
+def test_canonical_path_of_another_form(tmp_path: Path, monkeypatch):
+    tmp_path = tmp_path.resolve()
+    (tmp_path / "fonts").mkdir()
+    original_path = tmp_path / "fonts" / "alivia.ttf"
+    copy_path = tmp_path / "fonts" / "copy.ttf"
+    shutil.copyfile(TRUETYPE_31961_FONT_PATH, original_path)
+    shutil.copyfile(TRUETYPE_31961_FONT_PATH, copy_path)
+
+    # Scan a relative path, then look up the absolute path (like the ones returned by DirectWrite)
+    monkeypatch.chdir(tmp_path)
+    deduplication = FontDeduplication.scan([Path("fonts")])
+    assert deduplication.get_canonical_path(copy_path) == original_path
+    assert deduplication.get_canonical_path(Path("fonts", "..", "fonts", "copy.ttf")) == original_path
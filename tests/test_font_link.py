@@ -0,0 +1,94 @@
+import json
+from windows_fonts import create_logfont_like_vsfilter, FontFaceStore, FontLinkEntry, FontLinkResolver, LinkedFace, SystemLink
+from pathlib import Path
+
+FONTS_PATH = Path("C:/Windows/Fonts")
+
+
+def to_reg_hex(values):
+    data = "".join(value + "\0" for value in values).encode("utf-16-le") + b"\0\0"
+    return ",\\\r\n  ".join(",".join(f"{byte:02x}" for byte in data[i:i + 16]) for i in range(0, len(data), 16))
+
+
+def create_store() -> FontFaceStore:
+    store = FontFaceStore()
+    store.append("Segoe UI", "Regular", "Segoe UI", FONTS_PATH / "segoeui.ttf", 0, 400, False)
+    store.append("Segoe UI", "Bold", "Segoe UI Bold", FONTS_PATH / "segoeuib.ttf", 0, 700, False)
+    store.append("Tahoma", "Regular", "Tahoma", FONTS_PATH / "tahoma.ttf", 0, 400, False)
+    store.append("MS Gothic", "Regular", "MS Gothic", FONTS_PATH / "msgothic.ttc", 0, 400, False)
+    store.append("MS UI Gothic", "Regular", "MS UI Gothic", FONTS_PATH / "msgothic.ttc", 1, 400, False)
+    store.append("Microsoft JhengHei UI", "Regular", "Microsoft JhengHei UI", FONTS_PATH / "msjh.ttc", 1, 400, False)
+    return store
+
+
+def test_load_reg(tmp_path: Path):
+    reg = (
+        "Windows Registry Editor Version 5.00\r\n\r\n"
+        "[HKEY_LOCAL_MACHINE\\SOFTWARE\\Microsoft\\Windows NT\\CurrentVersion\\FontLink\\SystemLink]\r\n"
+        f"\"Segoe UI\"=hex(7):{to_reg_hex(['TAHOMA.TTF,Tahoma', 'MSGOTHIC.TTC,MS UI Gothic', 'MSJH.TTC,Microsoft JhengHei UI,128,96'])}\r\n\r\n"
+        "[HKEY_LOCAL_MACHINE\\SOFTWARE\\Other]\r\n"
+        f"\"Arial\"=hex(7):{to_reg_hex(['TAHOMA.TTF'])}\r\n"
+    )
+    path = tmp_path / "SystemLink.reg"
+    path.write_bytes(b"\xff\xfe" + reg.encode("utf-16-le"))
+
+    system_link = SystemLink.load(path)
+    assert len(system_link) == 1
+    assert system_link.get_entries("SEGOE UI") == [
+        FontLinkEntry("TAHOMA.TTF", "Tahoma"),
+        FontLinkEntry("MSGOTHIC.TTC", "MS UI Gothic"),
+        FontLinkEntry("MSJH.TTC", "Microsoft JhengHei UI", (128, 96)),
+    ]
+
+
+def test_fallback_chain(tmp_path: Path):
+    path = tmp_path / "SystemLink.json"
+    path.write_text(json.dumps({"Segoe UI": ["TAHOMA.TTF,Tahoma", "MSGOTHIC.TTC,MS UI Gothic", "MISSING.TTF,Missing", "tahoma.ttf"]}), encoding="utf-8")
+    resolver = FontLinkResolver(SystemLink.load(path), create_store())
+
+    chain = resolver.get_fallback_chain(create_logfont_like_vsfilter("segoe ui", 700))
+    assert [(face.path, face.face_index) for face in chain] == [
+        (FONTS_PATH / "segoeuib.ttf", 0),
+        (FONTS_PATH / "tahoma.ttf", 0),
+        (FONTS_PATH / "msgothic.ttc", 1),
+    ]
+    assert chain[1].entry == FontLinkEntry("TAHOMA.TTF", "Tahoma")
+    assert list(resolver.unresolved_entries) == [FontLinkEntry("MISSING.TTF", "Missing")]
+
+    # The chain of each base face is memoized
+    resolver.get_fallback_chain(create_logfont_like_vsfilter("Segoe UI", 700))
+    resolver.get_fallback_chain(create_logfont_like_vsfilter("Segoe UI", 400))
+    assert len(resolver.chains) == 2
+
+    assert resolver.get_fallback_paths(create_logfont_like_vsfilter("Tahoma")) == [FONTS_PATH / "tahoma.ttf"]
+
+
+def test_base_resolver():
+    system_link = SystemLink.from_values({"Segoe UI": ["TAHOMA.TTF,Tahoma"]})
+    resolver = FontLinkResolver(system_link, create_store(), lambda lf: (Path("D:/segoeui.ttf"), 0))
+    assert resolver.get_fallback_chain(create_logfont_like_vsfilter("Segoe UI")) == [
+        LinkedFace(Path("D:/segoeui.ttf"), 0),
+        LinkedFace(FONTS_PATH / "tahoma.ttf", 0, FontLinkEntry("TAHOMA.TTF", "Tahoma")),
+    ]
+
+
+def test_links_of_the_selected_face():
+    # GDI substitute the requested face, then use the links of the face which has been selected
+    system_link = SystemLink.from_values({"Segoe UI": ["TAHOMA.TTF,Tahoma"]})
+    resolver = FontLinkResolver(system_link, create_store(), lambda lf: (FONTS_PATH / "segoeui.ttf", 0))
+    assert resolver.get_fallback_chain(create_logfont_like_vsfilter("Segoe UI Variable")) == [
+        LinkedFace(FONTS_PATH / "segoeui.ttf", 0),
+        LinkedFace(FONTS_PATH / "tahoma.ttf", 0, FontLinkEntry("TAHOMA.TTF", "Tahoma")),
+    ]
+    resolver.get_fallback_chain(create_logfont_like_vsfilter("Segoe UI"))
+    assert len(resolver.chains) == 1
+
+
+def test_base_face_is_cached():
+    resolver = FontLinkResolver(SystemLink.from_values({}), create_store())
+    resolver.get_fallback_chain(create_logfont_like_vsfilter("Segoe UI", 700))
+    resolver.index = FontFaceStore()
+    assert resolver.get_fallback_paths(create_logfont_like_vsfilter("SEGOE UI", 700)) == [FONTS_PATH / "segoeuib.ttf"]
+
+    resolver.clear_cache()
+    assert resolver.get_fallback_paths(create_logfont_like_vsfilter("Segoe UI", 700)) == []
@@ -0,0 +1,74 @@
+import os
+from windows_fonts import FontFace, FontFaceStore, IndexSnapshot, NameID
+from pathlib import Path
+from fontTools.otlLib.builder import buildStatTable
+from fontTools.ttLib.tables._f_v_a_r import Axis, NamedInstance
+from fontTools.ttLib.ttFont import TTFont, newTable
+
+
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+TRUETYPE_31961_FONT_PATH = Path(os.path.join(DIR_PATH, "AliviaRegular_Weight31961.ttf"))
+
+
+def save_variable_font(path: Path) -> Path:
+    ttfont = TTFont(TRUETYPE_31961_FONT_PATH)
+    name = ttfont["name"]
+
+    fvar = newTable("fvar")
+    for tag, min_value, default_value, max_value in (("wght", 100, 400, 900), ("ital", 0, 0, 1)):
+        axis = Axis()
+        axis.axisTag = tag
+        axis.minValue, axis.defaultValue, axis.maxValue = min_value, default_value, max_value
+        axis.axisNameID = name.addName(tag)
+        fvar.axes.append(axis)
+
+    for subfamily, weight, italic in (("Regular", 400, 0), ("SemiBold Italic", 600, 1), ("Bold", 700, 0)):
+        instance = NamedInstance()
+        instance.subfamilyNameID = name.addName(subfamily)
+        instance.postscriptNameID = name.addName(f"Alivia-{subfamily.replace(' ', '')}")
+        instance.coordinates = {"wght": weight, "ital": italic}
+        fvar.instances.append(instance)
+    ttfont["fvar"] = fvar
+    buildStatTable(ttfont, [{"tag": "wght", "name": "Weight", "values": []}], elidedFallbackName=2)
+
+    ttfont.save(path)
+    return path
+
+
+def test_named_instances(tmp_path: Path):
+    path = save_variable_font(tmp_path / "variable.ttf")
+
+    face, = FontFace.from_file(path)
+    assert face.is_variable
+    assert [axis.tag for axis in face.variations.axes] == ["wght", "ital"]
+    assert face.variations.elided_fallback_name_id == 2
+
+    regular, semibold_italic, bold = FontFace.from_file(path, named_instances=True)
+    assert [instance.instance_index for instance in (regular, semibold_italic, bold)] == [0, 1, 2]
+
+    assert (regular.family_name, regular.get_name(NameID.SUBFAMILY), regular.full_name) == ("Alivia", "Regular", "Alivia")
+    assert (regular.weight, regular.is_italic) == (400, False)
+
+    assert (semibold_italic.family_name, semibold_italic.get_name(NameID.SUBFAMILY)) == ("Alivia SemiBold", "Italic")
+    assert semibold_italic.full_name == "Alivia SemiBold Italic"
+    assert semibold_italic.get_name(NameID.TYPOGRAPHIC_SUBFAMILY) == "SemiBold Italic"
+    assert semibold_italic.get_name(NameID.POSTSCRIPT_NAME) == "Alivia-SemiBoldItalic"
+    assert (semibold_italic.weight, semibold_italic.is_italic) == (600, True)
+
+    assert (bold.family_name, bold.get_name(NameID.SUBFAMILY), bold.weight) == ("Alivia", "Bold", 700)
+
+
+def test_index_named_instances(tmp_path: Path):
+    store = FontFaceStore()
+    store.add_files([save_variable_font(tmp_path / "variable.ttf"), TRUETYPE_31961_FONT_PATH])
+
+    assert [row.full_name for row in store.find("Alivia")] == ["Alivia", "Alivia Bold", "Alivia Regular Weight=31961"]
+    row, = store.find("alivia semibold", is_italic=True)
+    assert (row.weight, row.style, row.face_index) == (600, "Italic", 0)
+    assert row.instance_index == 1
+    assert [row.instance_index for row in store.find("Alivia")] == [0, 2, None]
+
+    IndexSnapshot.write(store, tmp_path / "index.bin")
+    with IndexSnapshot(tmp_path / "index.bin") as snapshot:
+        assert [row.instance_index for row in snapshot.find("Alivia")] == [0, 2, None]
+        assert snapshot.find("alivia semibold")[0].instance_index == 1
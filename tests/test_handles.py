@@ -0,0 +1,50 @@
+from windows_fonts import FontSession, GdiHandlePool, get_process_gdi_object_count
+
+
+def test_pool_evict_fonts():
+    with GdiHandlePool(max_dcs=1, max_fonts=2) as pool:
+        for weight in range(100, 1000, 100):
+            lf = FontSession.create_logfont_like_vsfilter("Arial", weight)
+            with pool.font(lf) as hfont, pool.dc() as dc:
+                assert hfont
+                assert dc
+
+        metrics = pool.get_metrics()
+        assert metrics["pooled_fonts"] == 2
+        assert metrics["pooled_dcs"] == 1
+        assert metrics["font_misses"] == 9
+
+        with pool.font(FontSession.create_logfont_like_vsfilter("arial", 900)):
+            pass
+        assert pool.get_metrics()["font_hits"] == 1
+
+    assert pool.get_metrics()["pooled_fonts"] == 0
+
+
+def test_session_flat_handle_count():
+    with FontSession() as session:
+        # Warm up the pool
+        for weight in range(100, 1000, 100):
+            session.get_font_filepath_like_vsfilter("Arial", weight)
+        session.clear_cache()
+        gdi_object_count = get_process_gdi_object_count()
+
+        for _ in range(20):
+            for weight in range(100, 1000, 100):
+                session.get_font_filepath_like_vsfilter("Arial", weight)
+            session.clear_cache()
+
+        assert get_process_gdi_object_count() == gdi_object_count
+
+
+def test_session_cache_is_bounded():
+    with FontSession(max_cached_fonts=2) as session:
+        for weight in range(100, 1000, 100):
+            session.get_font_filepath_like_vsfilter("Arial", weight)
+        assert len(session.cache) == 2
+
+        # The most recent LOGFONTW are kept
+        session.get_font_filepath_like_vsfilter("Arial", 900)
+        assert session.cache_hits == 1
+        session.get_font_filepath_like_vsfilter("Arial", 100)
+        assert session.cache_misses == 10
@@ -0,0 +1,76 @@
+import pytest
+from windows_fonts import CharacterSet, FontCatalogEntry, FontFaceStore, IndexSnapshot
+from pathlib import Path
+
+
+def create_store(family_count: int) -> FontFaceStore:
+    store = FontFaceStore()
+    for i in range(family_count):
+        store.append(f"Family {i}", "Regular", f"Family {i}", Path(f"C:/Fonts/family{i}.ttf"), 0, 400, False)
+        store.append(f"Family {i}", "Bold Italic", f"Family {i} Bold Italic", Path(f"C:/Fonts/family{i}bi.ttc"), 1, 700, True, 0x22, 4, FontCatalogEntry.get_charset_bit(CharacterSet.HANGUL_CHARSET), 1 << 56)
+    return store
+
+
+def test_write_and_query(tmp_path: Path):
+    snapshot_path = tmp_path / "index.bin"
+    IndexSnapshot.write(create_store(1000), snapshot_path)
+
+    with IndexSnapshot(snapshot_path) as snapshot:
+        snapshot.verify()
+        assert len(snapshot) == 2000
+
+        rows = snapshot.find("FAMILY 42")
+        assert [row.full_name for row in rows] == ["Family 42", "Family 42 Bold Italic"]
+        assert rows[1].path == Path("C:/Fonts/family42bi.ttc")
+        assert rows[1].face_index == 1
+        assert rows[1].is_italic
+        assert rows[1].pitch_and_family == 0x22
+        assert rows[1].to_catalog_entry().charsets == [CharacterSet.HANGUL_CHARSET]
+
+        assert [row.weight for row in snapshot.find("Family 7", is_italic=False)] == [400]
+        assert snapshot.find("Family 7", charset=CharacterSet.HANGUL_CHARSET)[0].style == "Bold Italic"
+        assert snapshot.find("Family 1000") == []
+
+        # Scan of every record
+        rows = snapshot.find(charset=CharacterSet.HANGUL_CHARSET, min_weight=700)
+        assert len(rows) == 1000
+        assert all(row.is_italic for row in rows)
+        assert len(snapshot.find(unicode_range=56, max_weight=700)) == 1000
+        assert rows[0].unicode_ranges == 1 << 56
+        assert snapshot.find(charset=CharacterSet.HANGUL_CHARSET, max_weight=400) == []
+
+
+def test_corrupted_snapshot(tmp_path: Path):
+    snapshot_path = tmp_path / "index.bin"
+    IndexSnapshot.write(create_store(10), snapshot_path)
+
+    data = bytearray(snapshot_path.read_bytes())
+    data[-1] ^= 0xFF
+    snapshot_path.write_bytes(bytes(data))
+    with IndexSnapshot(snapshot_path) as snapshot:
+        with pytest.raises(ValueError):
+            snapshot.verify()
+
+    snapshot_path.write_bytes(b"not an index snapshot, but long enough to have a header")
+    with pytest.raises(ValueError):
+        IndexSnapshot(snapshot_path)
+
+
+def test_write_version(tmp_path: Path):
+    snapshot_path = tmp_path / "index.bin"
+    with pytest.raises(FileNotFoundError):
+        IndexSnapshot.open_latest(snapshot_path)
+
+    assert IndexSnapshot.write_version(create_store(1), snapshot_path) == tmp_path / "index.bin.1"
+    with IndexSnapshot.open_latest(snapshot_path) as old_snapshot:
+        # A new version never replace a mapped file
+        assert IndexSnapshot.write_version(create_store(2), snapshot_path) == tmp_path / "index.bin.2"
+        assert len(old_snapshot) == 2
+        assert IndexSnapshot.get_latest_path(snapshot_path) != old_snapshot.path
+
+        with IndexSnapshot.open_latest(snapshot_path) as snapshot:
+            assert snapshot.path == tmp_path / "index.bin.2"
+            assert len(snapshot) == 4
+
+    IndexSnapshot.write_version(create_store(3), snapshot_path)
+    assert IndexSnapshot.get_versions(snapshot_path) == [(3, tmp_path / "index.bin.3")]
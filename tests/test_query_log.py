@@ -0,0 +1,93 @@
+import os
+import pytest
+import sys
+from windows_fonts import create_logfont_like_vsfilter, QueryLog
+from pathlib import Path
+
+if sys.platform == "win32":
+    from windows_fonts import FontSession, WindowsFonts
+
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+TRUETYPE_31961_FONT_PATH = Path(os.path.join(DIR_PATH, "AliviaRegular_Weight31961.ttf"))
+
+
+def test_record_and_reload(tmp_path: Path):
+    path = tmp_path / "queries.bin"
+    with QueryLog(path, capacity=16, flush_interval=10) as query_log:
+        for i in range(5):
+            for _ in range(i + 1):
+                query_log.record(create_logfont_like_vsfilter(f"Family {i}"))
+        # The pending records are counted too
+        assert [(lf.lfFaceName, count) for lf, count in query_log.hottest(2)] == [("family 4", 5), ("family 3", 4)]
+
+    with QueryLog(path) as query_log:
+        assert query_log.capacity == 16
+        assert [count for _, count in query_log.hottest(10)] == [5, 4, 3, 2, 1]
+        query_log.record(create_logfont_like_vsfilter("FAMILY 0"))
+        query_log.flush()
+        assert query_log.get_counts()[create_logfont_like_vsfilter("family 0").get_key()] == 2
+
+
+def test_full_log_evict_lowest_count(tmp_path: Path):
+    path = tmp_path / "queries.bin"
+    with QueryLog(path, capacity=4, flush_interval=1) as query_log:
+        for i, count in enumerate([3, 2, 1, 1, 1, 1]):
+            for _ in range(count):
+                query_log.record(create_logfont_like_vsfilter(f"Family {i}"))
+    size = path.stat().st_size
+
+    with QueryLog(path) as query_log:
+        # The keys logged first are the most frequent, so they are kept
+        assert sorted(lf.lfFaceName for lf, _ in query_log.hottest(10)) == ["family 0", "family 1", "family 4", "family 5"]
+        assert query_log.next_slot == 4
+    assert path.stat().st_size == size
+
+
+@pytest.mark.parametrize("flush_interval", [1, 64])
+def test_hot_key_survive_flood_of_unique_keys(tmp_path: Path, flush_interval: int):
+    hot_key = create_logfont_like_vsfilter("Hot A").get_key()
+    with QueryLog(tmp_path / "queries.bin", capacity=4, flush_interval=flush_interval) as query_log:
+        for _ in range(1000):
+            query_log.record_key(hot_key)
+        query_log.flush()
+
+        for i in range(2000):
+            query_log.record(create_logfont_like_vsfilter(f"One-off {i}"))
+        query_log.flush()
+
+        assert query_log.get_hottest_keys(1) == [hot_key]
+        assert query_log.get_counts()[hot_key] == 1000
+
+
+def test_flush_keep_most_frequent_new_keys(tmp_path: Path):
+    path = tmp_path / "queries.bin"
+    with QueryLog(path, capacity=2, flush_interval=100) as query_log:
+        for i, count in enumerate([1, 5, 2]):
+            for _ in range(count):
+                query_log.record(create_logfont_like_vsfilter(f"Family {i}"))
+        query_log.flush()
+        assert [(lf.lfFaceName, count) for lf, count in query_log.hottest(10)] == [("family 1", 5), ("family 2", 2)]
+
+
+def test_load_invalid_file(tmp_path: Path):
+    path = tmp_path / "queries.bin"
+    path.write_bytes(b"not a query log")
+    with pytest.raises(ValueError):
+        QueryLog(path)
+
+
+@pytest.mark.skipif(sys.platform != "win32", reason="GDI is only available on Windows")
+def test_session_warm_up(tmp_path: Path):
+    WindowsFonts.install_fonts(TRUETYPE_31961_FONT_PATH)
+    try:
+        with QueryLog(tmp_path / "queries.bin") as query_log:
+            with FontSession(query_log=query_log) as session:
+                session.get_font_filepath_like_vsfilter("Alivia")
+
+            with FontSession(query_log=query_log) as session:
+                session.start_warm_up(10).join()
+                assert session.cache_misses == 1
+                session.get_font_filepath_like_vsfilter("Alivia")
+                assert session.cache_hits == 1
+    finally:
+        WindowsFonts.uninstall_fonts(TRUETYPE_31961_FONT_PATH)
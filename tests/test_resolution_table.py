@@ -0,0 +1,75 @@
+import os
+import pytest
+import sys
+from windows_fonts import (
+    CharacterSet,
+    create_logfont_like_vsfilter,
+    FontCatalog,
+    FontCatalogEntry,
+    ResolutionMissError,
+    ResolutionRecorder,
+    ResolutionReplayer,
+    ResolutionTable,
+)
+from pathlib import Path
+
+if sys.platform == "win32":
+    from windows_fonts import FontSession, WindowsFonts
+
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+TRUETYPE_31961_FONT_PATH = Path(os.path.join(DIR_PATH, "AliviaRegular_Weight31961.ttf"))
+
+
+def test_save_load_and_replay(tmp_path: Path):
+    catalog = FontCatalog([FontCatalogEntry("Arial", "Arial", "Regular", 400, False, 0x22, 4, 1)])
+    fingerprint = catalog.get_fingerprint()
+
+    table = ResolutionTable()
+    for i in range(100):
+        lf = create_logfont_like_vsfilter(f"Family {i}", 700, True, CharacterSet.SHIFTJIS_CHARSET)
+        table.add(fingerprint, lf, Path(f"C:/Windows/Fonts/family{i % 10}.ttc"), i % 3)
+    table.save(tmp_path / "table.bin")
+
+    loaded = ResolutionTable.load(tmp_path / "table.bin")
+    assert loaded.entries == table.entries
+
+    replayer = ResolutionReplayer.from_catalog(loaded, catalog)
+    # The face name is compared case-insensitively, like GDI
+    lf = create_logfont_like_vsfilter("FAMILY 42", 700, True, CharacterSet.SHIFTJIS_CHARSET)
+    assert replayer.get_font_face_from_logfont(lf) == (Path("C:/Windows/Fonts/family2.ttc"), 0)
+
+    with pytest.raises(ResolutionMissError):
+        replayer.get_font_filepath_like_vsfilter("Family 42")
+
+    lenient_replayer = ResolutionReplayer(loaded, fingerprint, strict=False)
+    assert lenient_replayer.get_font_filepath_like_vsfilter("Family 42") is None
+    assert lenient_replayer.misses == 1
+    assert len(lenient_replayer.missed_keys) == 1
+
+    # Another installed font set doesn't reuse the decisions
+    other_catalog = FontCatalog(list(catalog) + [FontCatalogEntry("Alivia", "Alivia", "Regular", 400, False, 0x22, 4, 1)])
+    assert other_catalog.get_fingerprint() != fingerprint
+    with pytest.raises(ResolutionMissError):
+        ResolutionReplayer.from_catalog(loaded, other_catalog).get_font_face_from_logfont(lf)
+
+
+def test_load_invalid_file(tmp_path: Path):
+    path = tmp_path / "table.bin"
+    path.write_bytes(b"not a resolution table")
+    with pytest.raises(ValueError):
+        ResolutionTable.load(path)
+
+
+@pytest.mark.skipif(sys.platform != "win32", reason="GDI is only available on Windows")
+def test_record_and_replay(tmp_path: Path):
+    WindowsFonts.install_fonts(TRUETYPE_31961_FONT_PATH)
+    try:
+        with FontSession() as session:
+            recorder = ResolutionRecorder(session)
+            path = recorder.get_font_filepath_like_vsfilter("Alivia")
+            recorder.save(tmp_path / "table.bin")
+    finally:
+        WindowsFonts.uninstall_fonts(TRUETYPE_31961_FONT_PATH)
+
+    replayer = ResolutionReplayer(ResolutionTable.load(tmp_path / "table.bin"))
+    assert replayer.get_font_face_from_logfont(create_logfont_like_vsfilter("Alivia")) == (path, 0)
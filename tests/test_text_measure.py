@@ -0,0 +1,47 @@
+import os
+import pytest
+import struct
+from windows_fonts import FontMetrics, TextMeasurer
+from windows_fonts.text_measure import decode_kern
+from pathlib import Path
+
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+TRUETYPE_31961_FONT_PATH = Path(os.path.join(DIR_PATH, "AliviaRegular_Weight31961.ttf"))
+
+
+def test_measure():
+    with TextMeasurer() as measurer:
+        # The unitsPerEm of Alivia is 2048, so at this size the width is in font units
+        assert measurer.measure(TRUETYPE_31961_FONT_PATH, "Hello World", 2048) == 16593
+        assert measurer.measure(TRUETYPE_31961_FONT_PATH, "H", 20.48) == pytest.approx(31.33)
+        # The missing characters use the .notdef advance
+        assert measurer.measure(TRUETYPE_31961_FONT_PATH, "一", 2048) == 1079
+        assert measurer.measure_many(TRUETYPE_31961_FONT_PATH, ["Hello", "", "World"], 2048) == [6543, 0, 9360]
+
+
+def test_find_overflowing_lines():
+    with TextMeasurer(max_faces=1) as measurer:
+        lines = ["H", "Hello World", "e" * 10] * 1000
+        assert measurer.find_overflowing_lines(TRUETYPE_31961_FONT_PATH, lines, 2048, 8000)[:3] == [1, 4, 7]
+        assert len(measurer.metrics) == 1
+
+
+def test_invalid_font_close_mapping(tmp_path: Path):
+    path = tmp_path / "not_a_font.ttf"
+    path.write_bytes(b"not a font, but long enough to be mapped")
+
+    with pytest.raises(ValueError) as exc_info:
+        FontMetrics(path)
+
+    metrics = next(entry.locals["self"] for entry in exc_info.traceback if entry.name == "__init__" and isinstance(entry.locals.get("self"), FontMetrics))
+    assert metrics.data.closed
+    # A mapped file can't be deleted on Windows
+    path.unlink()
+
+
+def test_decode_kern():
+    pairs = [(1, 2, -50), (3, 4, 25)]
+    subtable = struct.pack(">HHHHHHH", 0, 14 + len(pairs) * 6, 0x0001, len(pairs), 0, 0, 0)
+    subtable += b"".join(struct.pack(">HHh", *pair) for pair in pairs)
+    kern = struct.pack(">HH", 0, 1) + subtable
+    assert decode_kern(kern) == {(1, 2): -50, (3, 4): 25}
@@ -1,6 +1,28 @@
-from .directwrite import *
-from .gdi import *
-from .user32 import *
-from .windows_fonts import *
+import sys
+from .daemon import *
+from .directwrite_matcher import *
+from .directwrite_types import *
+from .face_store import *
+from .font_catalog import *
+from .font_dedup import *
+from .font_face import *
+from .font_link import *
+from .font_variations import *
+from .index_snapshot import *
+from .logfont import *
+from .query_log import *
+from .resolution_table import *
+from .sfnt import *
+from .text_measure import *
+
+# The GDI and DirectWrite bindings only exist on Windows. The other modules don't use them, so they can be used on any OS.
+if sys.platform == "win32":
+    from .directwrite import *
+    from .gdi import *
+    from .handles import *
+    from .kernel32 import *
+    from .session import *
+    from .user32 import *
+    from .windows_fonts import *
 
 __version__ = "0.0.1"
\ No newline at end of file
@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import stat
+import sys
+import time
+from .daemon import FontDaemon, get_query_arguments, SessionBackend
+from .font_catalog import FontCatalog
+from .query_log import QueryLog
+from .session import FontSession
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, List, Optional
+
+__all__ = ["main"]
+
+DEFAULT_FLUSH_LINES = 256
+
+
+class JsonLinesWriter():
+    # Only keep flush_lines lines in memory before writing them, so a slow reader cannot make the buffer grow forever.
+
+    def __init__(self, stream: IO[str], flush_lines: int) -> None:
+        self.stream = stream
+        self.flush_lines = max(1, flush_lines)
+        self.lines: List[str] = []
+
+
+    def write(self, data: Dict[str, Any]) -> None:
+        self.lines.append(json.dumps(data, ensure_ascii=False))
+        if len(self.lines) >= self.flush_lines:
+            self.flush()
+
+
+    def flush(self) -> None:
+        if self.lines:
+            self.stream.write("\n".join(self.lines) + "\n")
+            self.lines.clear()
+        self.stream.flush()
+
+
+def get_default_flush_lines(stream: IO[str]) -> int:
+    # A client which read a pipe or a terminal may wait for each result before sending its next query,
+    # so the lines are only buffered when the output is a regular file
+    try:
+        is_regular_file = stat.S_ISREG(os.fstat(stream.fileno()).st_mode)
+    except (AttributeError, OSError, ValueError):
+        # For example an io.StringIO, which doesn't have any file descriptor
+        is_regular_file = True
+    return DEFAULT_FLUSH_LINES if is_regular_file else 1
+
+
+class Stats():
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.errors = 0
+        self.query_time = 0.0
+        self.start_time = time.perf_counter()
+
+
+    def format(self, session: FontSession) -> str:
+        elapsed = time.perf_counter() - self.start_time
+        rate = self.queries / elapsed if elapsed else 0.0
+        average = self.query_time / self.queries * 1e6 if self.queries else 0.0
+        handles = session.handles.get_metrics()
+        return (
+            f"queries={self.queries} errors={self.errors} elapsed={elapsed:.3f}s rate={rate:.0f}/s "
+            f"avg_query={average:.1f}us cache_hits={session.cache_hits} cache_misses={session.cache_misses} "
+            f"live_dcs={handles['live_dcs']} live_fonts={handles['live_fonts']} gdi_objects={handles['process_gdi_objects']}"
+        )
+
+
+def resolve(session: FontSession, query: Dict[str, Any]) -> Dict[str, Any]:
+    return {"path": str(session.get_font_filepath_like_vsfilter(*get_query_arguments(query)))}
+
+
+def enumerate_fonts(session: FontSession, query: Dict[str, Any]) -> Dict[str, Any]:
+    return {"fonts": [entry.to_dict() for entry in session.get_catalog_entries(*get_query_arguments(query))]}
+
+
+def search_index(catalog: FontCatalog, query: Dict[str, Any]) -> Dict[str, Any]:
+    entries = catalog.find(
+        query.get("family_name"),
+        query.get("weight"),
+        query.get("is_italic"),
+        query.get("charset"),
+    )
+    return {"fonts": [entry.to_dict() for entry in entries]}
+
+
+def run(handler: Callable[[Dict[str, Any]], Dict[str, Any]], input_stream: IO[str], writer: JsonLinesWriter, stats: Stats) -> None:
+    for line in input_stream:
+        if not line.strip():
+            continue
+
+        start_time = time.perf_counter()
+        query: Dict[str, Any] = {}
+        try:
+            query = json.loads(line)
+            result = handler(query)
+        except Exception as e:
+            stats.errors += 1
+            result = {"error": f"{type(e).__name__}: {e}"}
+        stats.query_time += time.perf_counter() - start_time
+        stats.queries += 1
+
+        if isinstance(query, dict) and "id" in query:
+            result = {"id": query["id"], **result}
+        writer.write(result)
+
+    writer.flush()
+
+
+def main(argv: Optional[List[str]] = None, stdin: Optional[IO[str]] = None, stdout: Optional[IO[str]] = None, stderr: Optional[IO[str]] = None) -> int:
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--stats", action="store_true", help="Print timing statistics to stderr")
+    common.add_argument("--flush-lines", type=int, help=f"Maximum number of output lines buffered before writing them (default: {DEFAULT_FLUSH_LINES} when stdout is a file, else 1)")
+
+    parser = argparse.ArgumentParser(prog="windows-fonts", description="Read JSON lines queries from stdin and write JSON lines results to stdout.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("resolve", parents=[common], help='Resolve {"family_name", "weight", "is_italic", "charset"} like VSFilter')
+    subparsers.add_parser("enumerate", parents=[common], help="Enumerate the faces GDI list for a query")
+    subparsers.add_parser("index", parents=[common], help="Search the faces of a catalog snapshot taken at startup")
+    daemon_parser = subparsers.add_parser("daemon", help="Serve resolve, enumerate, coverage and refresh queries over a local socket or named pipe")
+    daemon_parser.add_argument("--address", help="Unix domain socket path or named pipe name")
+    daemon_parser.add_argument("--query-log", help="Count the resolved queries in this file and warm up the cache from it at startup")
+    daemon_parser.add_argument("--warm-up", type=int, default=1000, help="Number of the most frequent queries of the query log resolved in the background at startup")
+    args = parser.parse_args(argv)
+
+    if args.command == "daemon":
+        query_log = QueryLog(Path(args.query_log)) if args.query_log else None
+        try:
+            with FontSession(query_log=query_log) as session:
+                if query_log is not None and args.warm_up > 0:
+                    session.start_warm_up(args.warm_up)
+                with FontDaemon(SessionBackend(session), args.address) as daemon:
+                    print(f"Listening on {daemon.address}", file=stderr)
+                    try:
+                        daemon.serve_forever()
+                    except KeyboardInterrupt:
+                        pass
+        finally:
+            if query_log is not None:
+                query_log.close()
+        return 0
+
+    stats = Stats()
+    writer = JsonLinesWriter(stdout, args.flush_lines if args.flush_lines is not None else get_default_flush_lines(stdout))
+
+    with FontSession() as session:
+        if args.command == "resolve":
+            handler = lambda query: resolve(session, query)
+        elif args.command == "enumerate":
+            handler = lambda query: enumerate_fonts(session, query)
+        else:
+            catalog = session.snapshot_catalog()
+            handler = lambda query: search_index(catalog, query)
+
+        try:
+            run(handler, stdin, writer, stats)
+        except BrokenPipeError:
+            pass
+
+        if args.stats:
+            print(stats.format(session), file=stderr)
+
+    return 0
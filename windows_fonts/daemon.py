@@ -0,0 +1,307 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+from .font_catalog import FontCatalog, FontCatalogEntry
+from .logfont import CharacterSet
+from abc import ABC, abstractmethod
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .session import FontSession
+
+__all__ = [
+    "FontDaemonError",
+    "FontBackend",
+    "SessionBackend",
+    "LoopbackBackend",
+    "FontDaemon",
+    "FontDaemonClient",
+    "get_daemon_address",
+]
+
+# Protocol
+#   Each message is a length-prefixed frame (see multiprocessing.connection.Connection.send_bytes) containing compact JSON.
+#   request:  [request_id, method, params]
+#   response: [request_id, result] or [request_id, None, error]
+#   The requests of a connection are answered in order, so a client can send many requests before reading the responses.
+
+
+class FontDaemonError(Exception):
+    pass
+
+
+def get_daemon_address(name: str = "windows-fonts") -> str:
+    if sys.platform == "win32":
+        return rf"\\.\pipe\{name}"
+    return os.path.join(tempfile.gettempdir(), f"{name}.sock")
+
+
+def get_query_arguments(params: Dict[str, Any]) -> Tuple[str, int, bool, CharacterSet]:
+    return (
+        params["family_name"],
+        int(params.get("weight", 400)),
+        bool(params.get("is_italic", False)),
+        CharacterSet(params.get("charset", CharacterSet.DEFAULT_CHARSET)),
+    )
+
+
+class FontBackend(ABC):
+    # Answer the requests of a FontDaemon. Each method receive the params of the request and return a JSON serializable result.
+
+    @abstractmethod
+    def resolve(self, params: Dict[str, Any]) -> str:
+        pass
+
+
+    @abstractmethod
+    def enumerate(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        pass
+
+
+    @abstractmethod
+    def coverage(self, params: Dict[str, Any]) -> str:
+        pass
+
+
+    def refresh(self, params: Dict[str, Any]) -> None:
+        # Forget what has been cached about the installed fonts. Send it after installing or uninstalling a font.
+        pass
+
+
+class SessionBackend(FontBackend):
+    # Answer with GDI. The session (its handles and its resolved paths) and a catalog of the installed faces are kept for the
+    # life of the daemon. The catalog is snapshotted on the first enumerate, so call refresh() after installing or uninstalling a font.
+
+    def __init__(self, session: Optional["FontSession"] = None) -> None:
+        if session is None:
+            # Imported here, so the daemon and the other backends don't need the Windows bindings
+            from .session import FontSession
+            session = FontSession()
+        self.session = session
+        self.catalog: Optional[FontCatalog] = None
+
+
+    def get_catalog(self) -> FontCatalog:
+        if self.catalog is None:
+            self.catalog = self.session.snapshot_catalog()
+        return self.catalog
+
+
+    def refresh(self, params: Optional[Dict[str, Any]] = None) -> None:
+        self.catalog = None
+        self.session.clear_cache()
+
+
+    def resolve(self, params: Dict[str, Any]) -> str:
+        return str(self.session.get_font_filepath_like_vsfilter(*get_query_arguments(params)))
+
+
+    def enumerate(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        family_name, _, _, charset = get_query_arguments(params)
+        return [entry.to_dict() for entry in self.get_catalog().find(family_name, charset=charset)]
+
+
+    def coverage(self, params: Dict[str, Any]) -> str:
+        lf = self.session.create_logfont_like_vsfilter(*get_query_arguments(params))
+        return self.session.get_missing_characters(lf, params["text"])
+
+
+class LoopbackBackend(FontBackend):
+    # Stand-in for SessionBackend which answer from an in-memory catalog. It doesn't call GDI, so it can be used to test the daemon and its clients.
+    # paths and characters are indexed by the full name of the faces.
+
+    def __init__(self, catalog: FontCatalog, paths: Dict[str, Path], characters: Optional[Dict[str, str]] = None) -> None:
+        self.catalog = catalog
+        self.paths = paths
+        self.characters = {full_name: set(text) for full_name, text in (characters or {}).items()}
+
+
+    def _find_entry(self, params: Dict[str, Any]) -> FontCatalogEntry:
+        family_name, weight, is_italic, charset = get_query_arguments(params)
+        entries = self.catalog.find(family_name, charset=charset)
+        if not entries:
+            raise LookupError(f"The family {family_name} isn't installed")
+        return min(entries, key=lambda entry: (entry.is_italic != is_italic, abs(entry.weight - weight)))
+
+
+    def resolve(self, params: Dict[str, Any]) -> str:
+        return str(self.paths[self._find_entry(params).full_name])
+
+
+    def enumerate(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        family_name, _, _, charset = get_query_arguments(params)
+        return [entry.to_dict() for entry in self.catalog.find(family_name, charset=charset)]
+
+
+    def coverage(self, params: Dict[str, Any]) -> str:
+        characters = self.characters.get(self._find_entry(params).full_name, set())
+        return "".join(character for character in dict.fromkeys(params["text"]) if character not in characters)
+
+
+class FontDaemon():
+    METHODS = ("resolve", "enumerate", "coverage", "refresh")
+
+    def __init__(self, backend: FontBackend, address: Optional[str] = None, authkey: Optional[bytes] = None) -> None:
+        self.backend = backend
+        self.address = address or get_daemon_address()
+        self.authkey = authkey
+        # The backend (and its DC) is shared by every connection
+        self.backend_lock = threading.Lock()
+        self.listener = Listener(self.address, authkey=self.authkey)
+        self.closed = False
+        self.serving = False
+        self.thread: Optional[threading.Thread] = None
+
+
+    def __enter__(self) -> "FontDaemon":
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+    def start(self) -> None:
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+
+    def serve_forever(self) -> None:
+        self.serving = True
+        try:
+            while not self.closed:
+                try:
+                    connection = self.listener.accept()
+                except (AuthenticationError, OSError, EOFError):
+                    if self.closed:
+                        break
+                    continue
+                threading.Thread(target=self.handle_connection, args=(connection,), daemon=True).start()
+        finally:
+            self.serving = False
+
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        # accept() isn't interrupted by close() on every platform, so wake it up with a last connection.
+        # This connection doesn't answer the authentication challenge, so it never wait for the listener: accept() fail on it.
+        if self.serving:
+            try:
+                Client(self.address).close()
+            except OSError:
+                pass
+        self.listener.close()
+        if self.thread is not None:
+            self.thread.join()
+
+
+    def handle_connection(self, connection: Connection) -> None:
+        with connection:
+            while True:
+                try:
+                    request = connection.recv_bytes()
+                except (EOFError, OSError):
+                    return
+                connection.send_bytes(self.handle_request(request))
+
+
+    def handle_request(self, request: bytes) -> bytes:
+        request_id = None
+        try:
+            request_id, method, params = json.loads(request)
+            if method not in FontDaemon.METHODS:
+                raise ValueError(f"The method {method} doesn't exist")
+            with self.backend_lock:
+                result = getattr(self.backend, method)(params)
+            response = [request_id, result]
+        except Exception as e:
+            response = [request_id, None, f"{type(e).__name__}: {e}"]
+        return json.dumps(response, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FontDaemonClient():
+
+    def __init__(self, address: Optional[str] = None, authkey: Optional[bytes] = None) -> None:
+        self.connection = Client(address or get_daemon_address(), authkey=authkey)
+        self.next_request_id = 0
+
+
+    def __enter__(self) -> "FontDaemonClient":
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+    def _send(self, method: str, params: Dict[str, Any]) -> int:
+        request_id = self.next_request_id
+        self.next_request_id += 1
+        self.connection.send_bytes(json.dumps([request_id, method, params], ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        return request_id
+
+
+    def _receive(self, request_id: int) -> Any:
+        response = json.loads(self.connection.recv_bytes())
+        if response[0] != request_id:
+            raise FontDaemonError(f"Received the response {response[0]} while waiting for {request_id}")
+        if len(response) == 3:
+            raise FontDaemonError(response[2])
+        return response[1]
+
+
+    def request(self, method: str, params: Dict[str, Any]) -> Any:
+        return self._receive(self._send(method, params))
+
+
+    def pipeline(self, requests: Iterable[Tuple[str, Dict[str, Any]]], window: int = 64) -> List[Any]:
+        # Keep at most window requests in flight, so neither side can block on a full pipe.
+        # The errors are returned as FontDaemonError instead of being raised.
+        pending: "deque[int]" = deque()
+        results: List[Any] = []
+
+        def receive_oldest():
+            try:
+                results.append(self._receive(pending.popleft()))
+            except FontDaemonError as e:
+                results.append(e)
+
+        for method, params in requests:
+            pending.append(self._send(method, params))
+            if len(pending) >= window:
+                receive_oldest()
+        while pending:
+            receive_oldest()
+
+        return results
+
+
+    def resolve(self, family_name: str, weight: int = 400, is_italic: bool = False, charset: CharacterSet = CharacterSet.DEFAULT_CHARSET) -> Path:
+        return Path(self.request("resolve", {"family_name": family_name, "weight": weight, "is_italic": is_italic, "charset": charset}))
+
+
+    def enumerate(self, family_name: str, weight: int = 400, is_italic: bool = False, charset: CharacterSet = CharacterSet.DEFAULT_CHARSET) -> List[FontCatalogEntry]:
+        entries = self.request("enumerate", {"family_name": family_name, "weight": weight, "is_italic": is_italic, "charset": charset})
+        return [FontCatalogEntry.from_dict(entry) for entry in entries]
+
+
+    def coverage(self, family_name: str, text: str, weight: int = 400, is_italic: bool = False, charset: CharacterSet = CharacterSet.DEFAULT_CHARSET) -> str:
+        # Return the characters of text which aren't in the resolved font
+        return self.request("coverage", {"family_name": family_name, "weight": weight, "is_italic": is_italic, "charset": charset, "text": text})
+
+
+    def refresh(self) -> None:
+        # Make the daemon forget its resolved paths and its catalog after installing or uninstalling a font
+        self.request("refresh", {})
@@ -1,9 +1,16 @@
+from .directwrite_types import (
+    DWRITE_FACTORY_TYPE,
+    DWRITE_FONT_FAMILY_MODEL,
+    DWRITE_FONT_SIMULATIONS,
+    DWRITE_FONT_STRETCH,
+    DWRITE_FONT_STYLE,
+    DWRITE_FONT_WEIGHT,
+)
 from comtypes import GUID, HRESULT, IUnknown, STDMETHOD
 from ctypes import POINTER, windll, wintypes
-from enum import IntEnum
 
+# The enums are in directwrite_types.py, so they can be used without comtypes
 __all__ = [
-    "DWRITE_FACTORY_TYPE",
     "IDWriteFontFileLoader",
     "IDWriteLocalFontFileLoader",
     "IDWriteFontFile",
@@ -16,12 +23,6 @@ __all__ = [
 ]
 
 
-class DWRITE_FACTORY_TYPE(IntEnum):
-    # https://learn.microsoft.com/en-us/windows/win32/api/dwrite/ne-dwrite-dwrite_factory_type
-    DWRITE_FACTORY_TYPE_SHARED = 0
-    DWRITE_FACTORY_TYPE_ISOLATED = 1
-
-
 class IDWriteFontFileLoader(IUnknown):
     # https://learn.microsoft.com/en-us/windows/win32/api/dwrite/nn-dwrite-idwritefontfileloader
     _iid_ = GUID("{727cad4e-d6af-4c9e-8a08-d695b11caa49}")
@@ -56,7 +57,7 @@ class IDWriteFontFace(IUnknown):
     _methods_ = [
         STDMETHOD(None, "GetType"),  # Need to be implemented
         STDMETHOD(HRESULT, "GetFiles", [POINTER(wintypes.UINT), POINTER(POINTER(IDWriteFontFile))]),
-        STDMETHOD(None, "GetIndex"),  # Need to be implemented
+        STDMETHOD(wintypes.UINT, "GetIndex"),
         STDMETHOD(None, "GetSimulations"),  # Need to be implemented
         STDMETHOD(None, "IsSymbolFont"),  # Need to be implemented
         STDMETHOD(None, "GetMetrics"),  # Need to be implemented
@@ -0,0 +1,176 @@
+import math
+from .directwrite_types import (
+    DWRITE_FONT_FAMILY_MODEL,
+    DWRITE_FONT_SIMULATIONS,
+    DWRITE_FONT_STRETCH,
+    DWRITE_FONT_STYLE,
+    DWRITE_FONT_WEIGHT,
+)
+from .font_face import FontFace, NameID
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+__all__ = [
+    "DirectWriteFontProperties",
+    "DirectWriteFontFamily",
+    "DirectWriteMatch",
+    "DirectWriteFontMatcher",
+]
+
+# The matching is the one of IDWriteFontFamily::GetFirstMatchingFont as implemented by Wine
+#   - https://gitlab.winehq.org/wine/wine/-/blob/master/dlls/dwrite/font.c (is_better_font_match, init_font_prop_vec)
+#   - https://gitlab.winehq.org/wine/wine/-/blob/master/dlls/dwrite/opentype.c (opentype_get_font_info_strings)
+
+
+@dataclass(frozen=True)
+class DirectWriteFontProperties:
+    weight: int
+    stretch: DWRITE_FONT_STRETCH
+    style: DWRITE_FONT_STYLE
+
+    @staticmethod
+    def from_face(face: FontFace) -> "DirectWriteFontProperties":
+        weight = face.weight
+        if 1 <= weight <= 9:
+            weight *= 100
+        if weight > DWRITE_FONT_WEIGHT.DWRITE_FONT_WEIGHT_EXTRA_BLACK:
+            weight = DWRITE_FONT_WEIGHT.DWRITE_FONT_WEIGHT_EXTRA_BLACK
+        elif weight == 0:
+            weight = DWRITE_FONT_WEIGHT.DWRITE_FONT_WEIGHT_NORMAL
+
+        stretch = DWRITE_FONT_STRETCH.DWRITE_FONT_STRETCH_NORMAL
+        if DWRITE_FONT_STRETCH.DWRITE_FONT_STRETCH_ULTRA_CONDENSED <= face.width <= DWRITE_FONT_STRETCH.DWRITE_FONT_STRETCH_ULTRA_EXPANDED:
+            stretch = DWRITE_FONT_STRETCH(face.width)
+
+        if face.is_oblique:
+            style = DWRITE_FONT_STYLE.DWRITE_FONT_STYLE_OBLIQUE
+        elif face.is_italic:
+            style = DWRITE_FONT_STYLE.DWRITE_FONT_STYLE_ITALIC
+        else:
+            style = DWRITE_FONT_STYLE.DWRITE_FONT_STYLE_NORMAL
+
+        return DirectWriteFontProperties(weight, stretch, style)
+
+
+    def get_vector(self) -> Tuple[float, float, float]:
+        return (
+            (self.stretch - DWRITE_FONT_STRETCH.DWRITE_FONT_STRETCH_NORMAL) * 11.0,
+            self.style * 7.0,
+            (self.weight - DWRITE_FONT_WEIGHT.DWRITE_FONT_WEIGHT_NORMAL) / 100.0 * 5.0,
+        )
+
+
+@dataclass
+class DirectWriteFontFamily:
+    name: str
+    faces: List[FontFace] = field(default_factory=list)
+
+
+@dataclass
+class DirectWriteMatch:
+    family: DirectWriteFontFamily
+    face: FontFace
+    properties: DirectWriteFontProperties
+    simulations: DWRITE_FONT_SIMULATIONS
+    reasons: List[str]
+
+
+class DirectWriteFontMatcher():
+
+    def __init__(self, faces: Iterable[FontFace], family_model: DWRITE_FONT_FAMILY_MODEL = DWRITE_FONT_FAMILY_MODEL.DWRITE_FONT_FAMILY_MODEL_WEIGHT_STRETCH_STYLE) -> None:
+        self.family_model = family_model
+        self.families: Dict[str, DirectWriteFontFamily] = {}
+        # Every localized family name point to its family
+        self.family_names: Dict[str, DirectWriteFontFamily] = {}
+        self.properties: Dict[int, DirectWriteFontProperties] = {}
+
+        for face in faces:
+            family_name_id = self.get_family_name_id(face)
+            family_name = face.get_name(family_name_id)
+            if family_name is None:
+                continue
+
+            family = self.families.get(family_name.casefold())
+            if family is None:
+                family = DirectWriteFontFamily(family_name)
+                self.families[family_name.casefold()] = family
+            family.faces.append(face)
+            self.properties[id(face)] = DirectWriteFontProperties.from_face(face)
+
+            for localized_name in face.get_names(family_name_id):
+                self.family_names.setdefault(localized_name.casefold(), family)
+
+
+    @staticmethod
+    def from_files(font_paths: Iterable[Path], family_model: DWRITE_FONT_FAMILY_MODEL = DWRITE_FONT_FAMILY_MODEL.DWRITE_FONT_FAMILY_MODEL_WEIGHT_STRETCH_STYLE) -> "DirectWriteFontMatcher":
+        return DirectWriteFontMatcher((face for font_path in font_paths for face in FontFace.from_file(font_path)), family_model)
+
+
+    def get_family_name_id(self, face: FontFace) -> NameID:
+        # WWS family: name ID 21, else the typographic family, else the Win32 family.
+        # Typographic family: name ID 16, else the Win32 family.
+        if self.family_model == DWRITE_FONT_FAMILY_MODEL.DWRITE_FONT_FAMILY_MODEL_WEIGHT_STRETCH_STYLE and face.get_names(NameID.WWS_FAMILY):
+            return NameID.WWS_FAMILY
+        if face.get_names(NameID.TYPOGRAPHIC_FAMILY):
+            return NameID.TYPOGRAPHIC_FAMILY
+        return NameID.FAMILY
+
+
+    def find_family_name(self, family_name: str) -> Optional[DirectWriteFontFamily]:
+        return self.family_names.get(family_name.casefold())
+
+
+    def get_first_matching_font(self, family: DirectWriteFontFamily, weight: int = DWRITE_FONT_WEIGHT.DWRITE_FONT_WEIGHT_NORMAL, stretch: DWRITE_FONT_STRETCH = DWRITE_FONT_STRETCH.DWRITE_FONT_STRETCH_NORMAL, style: DWRITE_FONT_STYLE = DWRITE_FONT_STYLE.DWRITE_FONT_STYLE_NORMAL) -> DirectWriteMatch:
+        requested = DirectWriteFontProperties(weight, stretch, style).get_vector()
+
+        def get_score(face: FontFace) -> Tuple[float, float, int, int, int]:
+            properties = self.properties[id(face)]
+            vector = properties.get_vector()
+            distance = math.sqrt(sum((a - b) ** 2 for a, b in zip(vector, requested)))
+            dot_product = sum(a * b for a, b in zip(vector, requested))
+            # Lower is better. On ties, the bigger stretch, then style, then weight win.
+            return (distance, -dot_product, -properties.stretch, -properties.style, -properties.weight)
+
+        candidates = sorted(family.faces, key=get_score)
+        face = candidates[0]
+        properties = self.properties[id(face)]
+        score = get_score(face)
+
+        reasons = [f"{self.describe(face)} has the distance {score[0]:.3f} and the dot product {-score[1]:.3f} to the requested properties"]
+        for other in candidates[1:]:
+            other_score = get_score(other)
+            if other_score[0] > score[0]:
+                reason = f"its distance is {other_score[0]:.3f}"
+            elif other_score[1] > score[1]:
+                reason = f"it has the same distance, but its dot product is {-other_score[1]:.3f}"
+            elif other_score != score:
+                reason = "it has the same distance and dot product, but a smaller stretch, style or weight"
+            else:
+                reason = "it has the same properties and has been added later to the family"
+            reasons.append(f"{self.describe(other)} lost because {reason}")
+
+        simulations = DWRITE_FONT_SIMULATIONS.DWRITE_FONT_SIMULATIONS_NONE
+        if weight - properties.weight >= 200 and weight >= DWRITE_FONT_WEIGHT.DWRITE_FONT_WEIGHT_SEMI_BOLD:
+            simulations |= DWRITE_FONT_SIMULATIONS.DWRITE_FONT_SIMULATIONS_BOLD
+            reasons.append(f"Bold is simulated because the requested weight {weight} is at least 200 heavier than {properties.weight}")
+        if style != DWRITE_FONT_STYLE.DWRITE_FONT_STYLE_NORMAL and properties.style == DWRITE_FONT_STYLE.DWRITE_FONT_STYLE_NORMAL:
+            simulations |= DWRITE_FONT_SIMULATIONS.DWRITE_FONT_SIMULATIONS_OBLIQUE
+            reasons.append("Oblique is simulated because the requested style is slanted, but the face is upright")
+
+        return DirectWriteMatch(family, face, properties, DWRITE_FONT_SIMULATIONS(simulations), reasons)
+
+
+    def match(self, family_name: str, weight: int = DWRITE_FONT_WEIGHT.DWRITE_FONT_WEIGHT_NORMAL, stretch: DWRITE_FONT_STRETCH = DWRITE_FONT_STRETCH.DWRITE_FONT_STRETCH_NORMAL, style: DWRITE_FONT_STYLE = DWRITE_FONT_STYLE.DWRITE_FONT_STYLE_NORMAL) -> Optional[DirectWriteMatch]:
+        family = self.find_family_name(family_name)
+        if family is None:
+            return None
+
+        result = self.get_first_matching_font(family, weight, stretch, style)
+        result.reasons.insert(0, f"The family {family.name!r} has been found with the name {family_name!r}")
+        return result
+
+
+    def describe(self, face: FontFace) -> str:
+        properties = self.properties[id(face)]
+        return f"{face.full_name!r} ({face.path}, index {face.face_index}, weight={properties.weight}, stretch={properties.stretch.name}, style={properties.style.name})"
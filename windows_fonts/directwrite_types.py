@@ -0,0 +1,65 @@
+from enum import IntEnum, IntFlag
+
+__all__ = [
+    "DWRITE_FACTORY_TYPE",
+    "DWRITE_FONT_WEIGHT",
+    "DWRITE_FONT_STRETCH",
+    "DWRITE_FONT_STYLE",
+    "DWRITE_FONT_SIMULATIONS",
+    "DWRITE_FONT_FAMILY_MODEL",
+]
+
+
+class DWRITE_FACTORY_TYPE(IntEnum):
+    # https://learn.microsoft.com/en-us/windows/win32/api/dwrite/ne-dwrite-dwrite_factory_type
+    DWRITE_FACTORY_TYPE_SHARED = 0
+    DWRITE_FACTORY_TYPE_ISOLATED = 1
+
+
+class DWRITE_FONT_WEIGHT(IntEnum):
+    # https://learn.microsoft.com/en-us/windows/win32/api/dwrite/ne-dwrite-dwrite_font_weight
+    DWRITE_FONT_WEIGHT_THIN = 100
+    DWRITE_FONT_WEIGHT_EXTRA_LIGHT = 200
+    DWRITE_FONT_WEIGHT_LIGHT = 300
+    DWRITE_FONT_WEIGHT_SEMI_LIGHT = 350
+    DWRITE_FONT_WEIGHT_NORMAL = 400
+    DWRITE_FONT_WEIGHT_MEDIUM = 500
+    DWRITE_FONT_WEIGHT_SEMI_BOLD = 600
+    DWRITE_FONT_WEIGHT_BOLD = 700
+    DWRITE_FONT_WEIGHT_EXTRA_BOLD = 800
+    DWRITE_FONT_WEIGHT_BLACK = 900
+    DWRITE_FONT_WEIGHT_EXTRA_BLACK = 950
+
+
+class DWRITE_FONT_STRETCH(IntEnum):
+    # https://learn.microsoft.com/en-us/windows/win32/api/dwrite/ne-dwrite-dwrite_font_stretch
+    DWRITE_FONT_STRETCH_UNDEFINED = 0
+    DWRITE_FONT_STRETCH_ULTRA_CONDENSED = 1
+    DWRITE_FONT_STRETCH_EXTRA_CONDENSED = 2
+    DWRITE_FONT_STRETCH_CONDENSED = 3
+    DWRITE_FONT_STRETCH_SEMI_CONDENSED = 4
+    DWRITE_FONT_STRETCH_NORMAL = 5
+    DWRITE_FONT_STRETCH_SEMI_EXPANDED = 6
+    DWRITE_FONT_STRETCH_EXPANDED = 7
+    DWRITE_FONT_STRETCH_EXTRA_EXPANDED = 8
+    DWRITE_FONT_STRETCH_ULTRA_EXPANDED = 9
+
+
+class DWRITE_FONT_STYLE(IntEnum):
+    # https://learn.microsoft.com/en-us/windows/win32/api/dwrite/ne-dwrite-dwrite_font_style
+    DWRITE_FONT_STYLE_NORMAL = 0
+    DWRITE_FONT_STYLE_OBLIQUE = 1
+    DWRITE_FONT_STYLE_ITALIC = 2
+
+
+class DWRITE_FONT_SIMULATIONS(IntFlag):
+    # https://learn.microsoft.com/en-us/windows/win32/api/dwrite/ne-dwrite-dwrite_font_simulations
+    DWRITE_FONT_SIMULATIONS_NONE = 0x0000
+    DWRITE_FONT_SIMULATIONS_BOLD = 0x0001
+    DWRITE_FONT_SIMULATIONS_OBLIQUE = 0x0002
+
+
+class DWRITE_FONT_FAMILY_MODEL(IntEnum):
+    # https://learn.microsoft.com/en-us/windows/win32/api/dwrite_3/ne-dwrite_3-dwrite_font_family_model
+    DWRITE_FONT_FAMILY_MODEL_TYPOGRAPHIC = 0
+    DWRITE_FONT_FAMILY_MODEL_WEIGHT_STRETCH_STYLE = 1
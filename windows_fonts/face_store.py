@@ -0,0 +1,366 @@
+import os
+import sys
+from .font_catalog import FontCatalog, FontCatalogEntry
+from .font_face import FontFace, NameID
+from .logfont import CharacterSet
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+__all__ = [
+    "StringPool",
+    "PackedStrings",
+    "FontFaceRow",
+    "FontFaceStore",
+]
+
+
+class StringPool():
+    # Intern the strings shared by many faces (family names, styles, directories).
+    # When casefold is True, the strings which only differ by their case share the same id (and the first spelling is kept).
+
+    def __init__(self, casefold: bool = False) -> None:
+        self.casefold = casefold
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+
+    def get_key(self, string: str) -> str:
+        if not self.casefold:
+            return string
+        key = string.casefold()
+        # Don't keep 2 copies of the strings that are already casefolded
+        return string if key == string else key
+
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+    def __getitem__(self, string_id: int) -> str:
+        return self.strings[string_id]
+
+
+    def intern(self, string: str) -> int:
+        key = self.get_key(string)
+        string_id = self.ids.get(key)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(string)
+            self.ids[key] = string_id
+        return string_id
+
+
+    def get_id(self, string: str) -> Optional[int]:
+        return self.ids.get(self.get_key(string))
+
+
+    def get_memory_usage(self) -> int:
+        keys = sum(sys.getsizeof(key) for key, string_id in self.ids.items() if key is not self.strings[string_id])
+        return sys.getsizeof(self.strings) + sys.getsizeof(self.ids) + sum(map(sys.getsizeof, self.strings)) + keys
+
+
+class PackedStrings():
+    # Store the strings which are (almost) unique to a face (full names, file names) as UTF-8 in one buffer
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.offsets = array("I", [0])
+
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+
+    def __getitem__(self, index: int) -> str:
+        return self.data[self.offsets[index]:self.offsets[index + 1]].decode("utf-8")
+
+
+    def append(self, string: str) -> None:
+        self.data += string.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+
+    def get_memory_usage(self) -> int:
+        return sys.getsizeof(self.data) + sys.getsizeof(self.offsets)
+
+
+class FontFaceRow():
+    # Lazy view over one face of a FontFaceStore. Nothing is decoded until an attribute is read.
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: "FontFaceStore", index: int) -> None:
+        self.store = store
+        self.index = index
+
+
+    def __repr__(self) -> str:
+        return f"FontFaceRow({self.full_name!r}, weight={self.weight}, is_italic={self.is_italic})"
+
+
+    @property
+    def family_name(self) -> str:
+        return self.store.family_names[self.store.family_ids[self.index]]
+
+
+    @property
+    def style(self) -> str:
+        return self.store.styles[self.store.style_ids[self.index]]
+
+
+    @property
+    def full_name(self) -> str:
+        flags = self.store.flags[self.index]
+        if flags & FontFaceStore.FLAG_FULL_NAME_IS_FAMILY:
+            return self.family_name
+        if flags & FontFaceStore.FLAG_FULL_NAME_IS_FAMILY_AND_STYLE:
+            return f"{self.family_name} {self.style}"
+        return self.store.full_names[self.index]
+
+
+    @property
+    def path(self) -> Optional[Path]:
+        filename = self.store.filenames[self.index]
+        if not filename:
+            return None
+        return Path(self.store.directories[self.store.directory_ids[self.index]], filename)
+
+
+    @property
+    def face_index(self) -> int:
+        return self.store.face_indices[self.index]
+
+
+    @property
+    def weight(self) -> int:
+        return self.store.weights[self.index]
+
+
+    @property
+    def is_italic(self) -> bool:
+        return bool(self.store.flags[self.index] & FontFaceStore.FLAG_ITALIC)
+
+
+    @property
+    def pitch_and_family(self) -> int:
+        return self.store.pitch_and_families[self.index]
+
+
+    @property
+    def font_type(self) -> int:
+        return self.store.font_types[self.index]
+
+
+    @property
+    def charset_mask(self) -> int:
+        return self.store.charset_masks[self.store.charset_mask_ids[self.index]]
+
+
+    @property
+    def charsets(self) -> List[CharacterSet]:
+        return [charset for charset in CharacterSet if self.charset_mask & FontCatalogEntry.get_charset_bit(charset)]
+
+
+    @property
+    def unicode_ranges(self) -> int:
+        return self.store.unicode_ranges[self.store.unicode_range_ids[self.index]]
+
+
+    @property
+    def instance_index(self) -> Optional[int]:
+        # Index of the named instance in the fvar table, or None for the default instance of the face
+        instance_index = self.store.instance_indices[self.index]
+        return None if instance_index == FontFaceStore.NO_INSTANCE else instance_index
+
+
+    def to_catalog_entry(self) -> FontCatalogEntry:
+        return FontCatalogEntry(self.family_name, self.full_name, self.style, self.weight, self.is_italic, self.pitch_and_family, self.font_type, self.charset_mask)
+
+
+class FontFaceStore():
+    # Struct of arrays. Each face cost around 37 bytes of columns plus its file name in UTF-8.
+    # The full name is only stored when it cannot be rebuilt from the family name and the style.
+    FLAG_ITALIC = 1 << 0
+    FLAG_FULL_NAME_IS_FAMILY = 1 << 1
+    FLAG_FULL_NAME_IS_FAMILY_AND_STYLE = 1 << 2
+    NO_INSTANCE = 0xFFFF
+
+    def __init__(self) -> None:
+        # GDI compare the family names case-insensitively
+        self.family_names = StringPool(casefold=True)
+        self.styles = StringPool()
+        self.directories = StringPool()
+        self.full_names = PackedStrings()
+        self.filenames = PackedStrings()
+        # There are only a few different charset masks and OS/2 Unicode ranges, so they are interned too
+        self.charset_masks: List[int] = []
+        self._charset_mask_ids: Dict[int, int] = {}
+        self.unicode_ranges: List[int] = []
+        self._unicode_range_ids: Dict[int, int] = {}
+
+        self.family_ids = array("I")
+        self.style_ids = array("I")
+        self.directory_ids = array("I")
+        self.face_indices = array("H")
+        self.weights = array("H")
+        self.flags = array("B")
+        self.pitch_and_families = array("B")
+        self.font_types = array("B")
+        # A mask id can go past 65535 when every face has its own Unicode ranges, so the ids take 32 bits
+        self.charset_mask_ids = array("I")
+        self.unicode_range_ids = array("I")
+        self.instance_indices = array("H")
+
+
+    def __len__(self) -> int:
+        return len(self.family_ids)
+
+
+    def __getitem__(self, index: int) -> FontFaceRow:
+        if not 0 <= index < len(self):
+            raise IndexError(f"The face {index} doesn't exist")
+        return FontFaceRow(self, index)
+
+
+    def __iter__(self) -> Iterator[FontFaceRow]:
+        return (FontFaceRow(self, index) for index in range(len(self)))
+
+
+    @staticmethod
+    def _intern_mask(masks: List[int], mask_ids: Dict[int, int], mask: int) -> int:
+        mask_id = mask_ids.get(mask)
+        if mask_id is None:
+            mask_id = len(masks)
+            masks.append(mask)
+            mask_ids[mask] = mask_id
+        return mask_id
+
+
+    def append(self, family_name: str, style: str, full_name: str, path: Optional[Union[str, Path]], face_index: int, weight: int, is_italic: bool, pitch_and_family: int = 0, font_type: int = 0, charset_mask: int = 0, unicode_ranges: int = 0, instance_index: Optional[int] = None) -> int:
+        charset_mask_id = FontFaceStore._intern_mask(self.charset_masks, self._charset_mask_ids, charset_mask)
+        unicode_range_id = FontFaceStore._intern_mask(self.unicode_ranges, self._unicode_range_ids, unicode_ranges)
+
+        if path is None:
+            directory, filename = "", ""
+        else:
+            directory, filename = os.path.split(os.fspath(path))
+
+        family_id = self.family_names.intern(family_name)
+        family_name = self.family_names[family_id]
+
+        flags = FontFaceStore.FLAG_ITALIC if is_italic else 0
+        if full_name == family_name:
+            flags |= FontFaceStore.FLAG_FULL_NAME_IS_FAMILY
+            full_name = ""
+        elif full_name == f"{family_name} {style}":
+            flags |= FontFaceStore.FLAG_FULL_NAME_IS_FAMILY_AND_STYLE
+            full_name = ""
+
+        self.family_ids.append(family_id)
+        self.style_ids.append(self.styles.intern(style))
+        self.directory_ids.append(self.directories.intern(directory))
+        self.full_names.append(full_name)
+        self.filenames.append(filename)
+        self.face_indices.append(face_index)
+        # usWeightClass can be bigger than what LOGFONTW accept, but it always fit in 16 bits
+        self.weights.append(weight)
+        self.flags.append(flags)
+        self.pitch_and_families.append(pitch_and_family)
+        self.font_types.append(font_type)
+        self.charset_mask_ids.append(charset_mask_id)
+        self.unicode_range_ids.append(unicode_range_id)
+        self.instance_indices.append(FontFaceStore.NO_INSTANCE if instance_index is None else instance_index)
+        return len(self) - 1
+
+
+    def add_catalog(self, catalog: FontCatalog) -> None:
+        for entry in catalog:
+            self.append(entry.family_name, entry.style, entry.full_name, None, 0, entry.weight, entry.is_italic, entry.pitch_and_family, entry.font_type, entry.charset_mask)
+
+
+    def add_faces(self, faces: Iterable[FontFace]) -> None:
+        for face in faces:
+            self.append(
+                face.family_name or "",
+                face.get_name(NameID.SUBFAMILY) or "",
+                face.full_name or "",
+                face.path,
+                face.face_index,
+                face.weight,
+                face.is_italic,
+                charset_mask=face.charset_mask,
+                unicode_ranges=face.unicode_ranges,
+                instance_index=face.instance_index,
+            )
+
+
+    def add_files(self, paths: Iterable[Path], named_instances: bool = True) -> None:
+        # Like GDI, each named instance of a variable font is its own face
+        for path in paths:
+            self.add_faces(FontFace.from_file(path, named_instances))
+
+
+    def find(self, family_name: Optional[str] = None, weight: Optional[int] = None, is_italic: Optional[bool] = None, charset: Optional[int] = None, min_weight: Optional[int] = None, max_weight: Optional[int] = None, unicode_range: Optional[int] = None) -> List[FontFaceRow]:
+        # One pass over the columns. The masks are tested once per distinct mask, then each face only compare its mask id.
+        # unicode_range is a bit of the OS/2 Unicode ranges, for example 56 for Hangul Syllables.
+        family_id = None
+        if family_name is not None:
+            family_id = self.family_names.get_id(family_name)
+            if family_id is None:
+                return []
+
+        charset_mask_ids = None
+        if charset is not None and charset != CharacterSet.DEFAULT_CHARSET:
+            charset_bit = FontCatalogEntry.get_charset_bit(charset)
+            charset_mask_ids = {mask_id for mask_id, mask in enumerate(self.charset_masks) if mask & charset_bit}
+
+        unicode_range_ids = None
+        if unicode_range is not None:
+            unicode_range_ids = {range_id for range_id, ranges in enumerate(self.unicode_ranges) if ranges & (1 << unicode_range)}
+
+        italic_flag = None if is_italic is None else (FontFaceStore.FLAG_ITALIC if is_italic else 0)
+
+        rows = []
+        for index in range(len(self)):
+            if family_id is not None and self.family_ids[index] != family_id:
+                continue
+            if weight is not None and self.weights[index] != weight:
+                continue
+            if min_weight is not None and self.weights[index] < min_weight:
+                continue
+            if max_weight is not None and self.weights[index] > max_weight:
+                continue
+            if italic_flag is not None and self.flags[index] & FontFaceStore.FLAG_ITALIC != italic_flag:
+                continue
+            if charset_mask_ids is not None and self.charset_mask_ids[index] not in charset_mask_ids:
+                continue
+            if unicode_range_ids is not None and self.unicode_range_ids[index] not in unicode_range_ids:
+                continue
+            rows.append(FontFaceRow(self, index))
+        return rows
+
+
+    def get_memory_usage(self) -> int:
+        columns = [
+            self.family_ids,
+            self.style_ids,
+            self.directory_ids,
+            self.face_indices,
+            self.weights,
+            self.flags,
+            self.pitch_and_families,
+            self.font_types,
+            self.charset_mask_ids,
+            self.unicode_range_ids,
+            self.instance_indices,
+        ]
+        return (
+            sum(map(sys.getsizeof, columns))
+            + self.family_names.get_memory_usage()
+            + self.styles.get_memory_usage()
+            + self.directories.get_memory_usage()
+            + self.full_names.get_memory_usage()
+            + self.filenames.get_memory_usage()
+            + sys.getsizeof(self.charset_masks)
+            + sys.getsizeof(self.unicode_ranges)
+        )
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+from .logfont import CharacterSet, ENUMLOGFONTEXW
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+__all__ = [
+    "FontCatalogEntry",
+    "FontCatalogDiff",
+    "FontCatalog",
+]
+
+
+@dataclass(frozen=True)
+class FontCatalogEntry:
+    family_name: str
+    full_name: str
+    style: str
+    weight: int
+    is_italic: bool
+    pitch_and_family: int
+    font_type: int
+    # Bit N is set when the face has been enumerated with lfCharSet == N
+    charset_mask: int
+    # The file GDI select for the face, when it has been resolved (see with_file())
+    path: Optional[str] = None
+    file_size: int = 0
+    file_mtime_ns: int = 0
+
+    @staticmethod
+    def from_logfont(logfont: ENUMLOGFONTEXW, font_type: int) -> "FontCatalogEntry":
+        lf = logfont.elfLogFont
+        return FontCatalogEntry(
+            lf.lfFaceName,
+            logfont.elfFullName,
+            logfont.elfStyle,
+            lf.lfWeight,
+            bool(lf.lfItalic),
+            lf.lfPitchAndFamily,
+            int(font_type),
+            FontCatalogEntry.get_charset_bit(lf.lfCharSet),
+        )
+
+    @staticmethod
+    def get_charset_bit(charset: int) -> int:
+        return 1 << charset
+
+    def with_file(self, path: Path) -> "FontCatalogEntry":
+        stat = os.stat(path)
+        return replace(self, path=str(path), file_size=stat.st_size, file_mtime_ns=stat.st_mtime_ns)
+
+    @property
+    def identity(self) -> Tuple[str, str, str, int, bool, int, int]:
+        # Everything except the charset and the file. EnumFontFamiliesExW report the same face once per charset.
+        return (self.family_name, self.full_name, self.style, self.weight, self.is_italic, self.pitch_and_family, self.font_type)
+
+    @property
+    def charsets(self) -> List[CharacterSet]:
+        return [charset for charset in CharacterSet if self.supports_charset(charset)]
+
+    def supports_charset(self, charset: int) -> bool:
+        return bool(self.charset_mask & FontCatalogEntry.get_charset_bit(charset))
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(data: Dict[str, object]) -> "FontCatalogEntry":
+        return FontCatalogEntry(**data)
+
+
+@dataclass
+class FontCatalogDiff:
+    added: List[FontCatalogEntry] = field(default_factory=list)
+    removed: List[FontCatalogEntry] = field(default_factory=list)
+    # (previous, current) pairs of the faces whose charsets changed
+    changed: List[Tuple[FontCatalogEntry, FontCatalogEntry]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+class FontCatalog():
+
+    def __init__(self, entries: Iterable[FontCatalogEntry]) -> None:
+        self.entries = list(entries)
+
+        self._by_family: Dict[str, List[FontCatalogEntry]] = {}
+        self._by_weight: Dict[int, List[FontCatalogEntry]] = {}
+        self._by_italic: Dict[bool, List[FontCatalogEntry]] = {}
+        self._by_charset: Dict[int, List[FontCatalogEntry]] = {}
+
+        for entry in self.entries:
+            # GDI compare the family name case-insensitively
+            self._by_family.setdefault(entry.family_name.casefold(), []).append(entry)
+            self._by_weight.setdefault(entry.weight, []).append(entry)
+            self._by_italic.setdefault(entry.is_italic, []).append(entry)
+            for charset in range(entry.charset_mask.bit_length()):
+                if entry.supports_charset(charset):
+                    self._by_charset.setdefault(charset, []).append(entry)
+
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+    def __iter__(self) -> Iterator[FontCatalogEntry]:
+        return iter(self.entries)
+
+
+    @staticmethod
+    def collapse(entries: Iterable[FontCatalogEntry]) -> "FontCatalog":
+        # The faces stay in the order of their first enumeration
+        collapsed: Dict[Tuple[str, str, str, int, bool, int, int], FontCatalogEntry] = {}
+        for entry in entries:
+            previous = collapsed.get(entry.identity)
+            collapsed[entry.identity] = entry if previous is None else replace(previous, charset_mask=previous.charset_mask | entry.charset_mask)
+
+        return FontCatalog(collapsed.values())
+
+
+    def get_family_names(self) -> List[str]:
+        return [entries[0].family_name for entries in self._by_family.values()]
+
+
+    def find(self, family_name: Optional[str] = None, weight: Optional[int] = None, is_italic: Optional[bool] = None, charset: Optional[int] = None) -> List[FontCatalogEntry]:
+        candidates: List[List[FontCatalogEntry]] = []
+        if family_name is not None:
+            candidates.append(self._by_family.get(family_name.casefold(), []))
+        if weight is not None:
+            candidates.append(self._by_weight.get(weight, []))
+        if is_italic is not None:
+            candidates.append(self._by_italic.get(is_italic, []))
+        if charset is not None and charset != CharacterSet.DEFAULT_CHARSET:
+            candidates.append(self._by_charset.get(charset, []))
+
+        if not candidates:
+            return list(self.entries)
+
+        # Start from the smallest bucket and filter it with the others
+        candidates.sort(key=len)
+        result = candidates[0]
+        for other in candidates[1:]:
+            other_ids = set(map(id, other))
+            result = [entry for entry in result if id(entry) in other_ids]
+        return result
+
+
+    def get_fingerprint(self) -> bytes:
+        # Identify the installed font set: the faces, the files GDI select for them and the enumeration order,
+        # since GDI pick the first enumerated face among equal candidates. Two machines with the same faces in other
+        # files (or in another version of a file) don't get the same fingerprint.
+        digest = hashlib.blake2b(digest_size=16)
+        for entry in self.entries:
+            digest.update(json.dumps(entry.to_dict(), ensure_ascii=False, sort_keys=True).encode("utf-8"))
+            digest.update(b"\n")
+        return digest.digest()
+
+
+    def diff(self, previous: "FontCatalog") -> FontCatalogDiff:
+        current_entries = {entry.identity: entry for entry in self.entries}
+        previous_entries = {entry.identity: entry for entry in previous.entries}
+
+        result = FontCatalogDiff()
+        for identity, entry in current_entries.items():
+            previous_entry = previous_entries.get(identity)
+            if previous_entry is None:
+                result.added.append(entry)
+            elif previous_entry.charset_mask != entry.charset_mask:
+                result.changed.append((previous_entry, entry))
+
+        for identity, previous_entry in previous_entries.items():
+            if identity not in current_entries:
+                result.removed.append(previous_entry)
+
+        return result
+
+
+    def save(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump([entry.to_dict() for entry in self.entries], file, ensure_ascii=False)
+
+
+    @staticmethod
+    def load(path: Path) -> "FontCatalog":
+        with open(path, "r", encoding="utf-8") as file:
+            return FontCatalog(FontCatalogEntry.from_dict(data) for data in json.load(file))
@@ -0,0 +1,156 @@
+import hashlib
+import mmap
+import os
+import struct
+from .sfnt import SfntFace
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+__all__ = [
+    "FONT_EXTENSIONS",
+    "FontDuplicateGroup",
+    "FontDeduplication",
+]
+
+FONT_EXTENSIONS = frozenset([".ttf", ".ttc", ".otf", ".otc", ".fon", ".fnt"])
+
+T = TypeVar("T")
+
+
+def _open_mmap(path: Path, callback: Callable[[mmap.mmap], T], empty: T) -> T:
+    with open(path, "rb") as file:
+        # A file of 0 byte cannot be mapped
+        if os.fstat(file.fileno()).st_size == 0:
+            return empty
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return callback(data)
+
+
+def normalize_path(path: Path) -> Path:
+    # DirectWrite and GDI return absolute paths, which may not have the case (or the symlinks) of the scanned paths
+    return Path(path).resolve()
+
+
+def get_head_checksum_adjustment(path: Path) -> Optional[int]:
+    def read_checksum(data: mmap.mmap) -> Optional[int]:
+        try:
+            return SfntFace(data).get_head_checksum_adjustment()
+        except (ValueError, struct.error):
+            # .fon, .fnt or a corrupted font. Only the full hash can tell if it is a duplicate.
+            return None
+
+    return _open_mmap(path, read_checksum, None)
+
+
+def get_content_hash(path: Path) -> str:
+    def hash_data(data: mmap.mmap) -> str:
+        # hashlib release the GIL while hashing big buffers, so the files are really hashed in parallel
+        return hashlib.sha256(data).hexdigest()
+
+    return _open_mmap(path, hash_data, hashlib.sha256().hexdigest())
+
+
+@dataclass
+class FontDuplicateGroup:
+    content_hash: str
+    # The first path is the canonical one
+    paths: List[Path]
+
+    @property
+    def canonical_path(self) -> Path:
+        return self.paths[0]
+
+    @property
+    def duplicate_paths(self) -> List[Path]:
+        return self.paths[1:]
+
+
+class FontDeduplication():
+
+    def __init__(self, groups: Iterable[FontDuplicateGroup], unique_paths: Iterable[Path]) -> None:
+        # groups only contain the files which have at least one copy. unique_paths are the files without any copy.
+        self.groups = list(groups)
+        self.unique_paths = list(unique_paths) + [group.canonical_path for group in self.groups]
+        # The keys are normalized, so a path is found whatever its form
+        self.canonical_paths: Dict[Path, Path] = {normalize_path(path): path for path in self.unique_paths}
+        for group in self.groups:
+            for path in group.paths:
+                self.canonical_paths[normalize_path(path)] = group.canonical_path
+
+
+    @staticmethod
+    def find_font_files(paths: Iterable[Path]) -> List[Path]:
+        font_files: Dict[Path, None] = {}
+        for path in map(normalize_path, paths):
+            if path.is_dir():
+                for root, _, filenames in os.walk(path):
+                    for filename in sorted(filenames):
+                        if os.path.splitext(filename)[1].lower() in FONT_EXTENSIONS:
+                            font_files.setdefault(Path(root, filename), None)
+            else:
+                font_files.setdefault(path, None)
+        return list(font_files)
+
+
+    @staticmethod
+    def scan(paths: Iterable[Path], max_workers: Optional[int] = None) -> "FontDeduplication":
+        # The files (or the font files in the directories) are compared in 3 passes:
+        #   1. group by size,
+        #   2. split the groups with the head checksumAdjustment (which is a checksum of the whole font),
+        #   3. hash only the files which still collide.
+        # When 2 files are identical, the canonical one is the first one that has been found.
+        font_files = FontDeduplication.find_font_files(paths)
+
+        by_size: Dict[int, List[Path]] = {}
+        for path in font_files:
+            by_size.setdefault(path.stat().st_size, []).append(path)
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            candidates = [path for same_size in by_size.values() if len(same_size) > 1 for path in same_size]
+            checksums = dict(zip(candidates, executor.map(get_head_checksum_adjustment, candidates)))
+
+            by_checksum: Dict[Tuple[int, Optional[int]], List[Path]] = {}
+            for path in candidates:
+                by_checksum.setdefault((path.stat().st_size, checksums[path]), []).append(path)
+
+            candidates = [path for same_checksum in by_checksum.values() if len(same_checksum) > 1 for path in same_checksum]
+            content_hashes = dict(zip(candidates, executor.map(get_content_hash, candidates)))
+
+        by_hash: Dict[str, List[Path]] = {}
+        for path in candidates:
+            by_hash.setdefault(content_hashes[path], []).append(path)
+
+        groups = [FontDuplicateGroup(content_hash, same_hash) for content_hash, same_hash in by_hash.items() if len(same_hash) > 1]
+        duplicated_paths = {path for group in groups for path in group.paths}
+
+        return FontDeduplication(groups, (path for path in font_files if path not in duplicated_paths))
+
+
+    def get_canonical_path(self, path: Path) -> Path:
+        return self.canonical_paths.get(normalize_path(path), Path(path))
+
+
+    def get_unique_paths(self) -> List[Path]:
+        return list(self.unique_paths)
+
+
+    def hardlink_duplicates(self) -> int:
+        # Replace every duplicate by a hardlink to its canonical file. Return the number of files that have been replaced.
+        replaced = 0
+        for group in self.groups:
+            for path in group.duplicate_paths:
+                if os.path.samefile(path, group.canonical_path):
+                    continue
+
+                # Create the link next to the duplicate, then replace it atomically
+                temporary_path = path.with_name(path.name + ".dedup")
+                os.link(group.canonical_path, temporary_path)
+                try:
+                    os.replace(temporary_path, path)
+                except OSError:
+                    temporary_path.unlink()
+                    raise
+                replaced += 1
+        return replaced
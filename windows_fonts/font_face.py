@@ -0,0 +1,260 @@
+import struct
+from .font_variations import FontVariations, NamedInstance
+from .logfont import CharacterSet
+from .sfnt import get_face_offsets, SfntFace
+from dataclasses import dataclass, field, replace
+from enum import IntEnum
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+__all__ = [
+    "NameID",
+    "FontFace",
+]
+
+
+class NameID(IntEnum):
+    # https://learn.microsoft.com/en-us/typography/opentype/spec/name#name-ids
+    FAMILY = 1
+    SUBFAMILY = 2
+    FULL_NAME = 4
+    POSTSCRIPT_NAME = 6
+    TYPOGRAPHIC_FAMILY = 16
+    TYPOGRAPHIC_SUBFAMILY = 17
+    WWS_FAMILY = 21
+    WWS_SUBFAMILY = 22
+
+
+ENGLISH_US_LANGUAGE_ID = 0x0409
+
+# https://learn.microsoft.com/en-us/typography/opentype/spec/os2#fsselection
+FS_SELECTION_ITALIC = 1 << 0
+FS_SELECTION_BOLD = 1 << 5
+FS_SELECTION_REGULAR = 1 << 6
+FS_SELECTION_OBLIQUE = 1 << 9
+# https://learn.microsoft.com/en-us/typography/opentype/spec/head
+MAC_STYLE_BOLD = 1 << 0
+MAC_STYLE_ITALIC = 1 << 1
+# https://learn.microsoft.com/en-us/typography/opentype/spec/os2#ulcodepagerange
+# Bit of ulCodePageRange1/2 -> charset, like the TranslateCharsetInfo table that GDI use
+CODE_PAGE_CHARSETS = {
+    0: CharacterSet.ANSI_CHARSET,
+    1: CharacterSet.EASTEUROPE_CHARSET,
+    2: CharacterSet.RUSSIAN_CHARSET,
+    3: CharacterSet.GREEK_CHARSET,
+    4: CharacterSet.TURKISH_CHARSET,
+    5: CharacterSet.HEBREW_CHARSET,
+    6: CharacterSet.ARABIC_CHARSET,
+    7: CharacterSet.BALTIC_CHARSET,
+    8: CharacterSet.VIETNAMESE_CHARSET,
+    16: CharacterSet.THAI_CHARSET,
+    17: CharacterSet.SHIFTJIS_CHARSET,
+    18: CharacterSet.GB2312_CHARSET,
+    19: CharacterSet.HANGUL_CHARSET,
+    20: CharacterSet.CHINESEBIG5_CHARSET,
+    21: CharacterSet.JOHAB_CHARSET,
+    29: CharacterSet.MAC_CHARSET,
+    30: CharacterSet.OEM_CHARSET,
+    31: CharacterSet.SYMBOL_CHARSET,
+}
+# The words that GDI keep in the style of a named instance. The other words are moved to the family name.
+RIBBI_STYLE_WORDS = ("Bold", "Italic")
+
+
+def read_names(face: SfntFace) -> Dict[int, Dict[int, str]]:
+    # Return {name_id: {language_id: name}} of the Windows Unicode names
+    # https://learn.microsoft.com/en-us/typography/opentype/spec/name
+    names: Dict[int, Dict[int, str]] = {}
+    name = face.get_table("name")
+    if name is None:
+        return names
+
+    _, count, storage_offset = struct.unpack_from(">HHH", name, 0)
+    for i in range(count):
+        platform_id, encoding_id, language_id, name_id, length, offset = struct.unpack_from(">6H", name, 6 + i * 12)
+        # Like GDI and DirectWrite, only use the Windows Symbol, Unicode BMP and Unicode full repertoire names
+        if platform_id != 3 or encoding_id not in (0, 1, 10):
+            continue
+        start = storage_offset + offset
+        value = bytes(name[start:start + length]).decode("utf-16-be", errors="replace")
+        names.setdefault(name_id, {}).setdefault(language_id, value)
+    return names
+
+
+@dataclass
+class FontFace:
+    path: Path
+    face_index: int
+    names: Dict[int, Dict[int, str]] = field(repr=False)
+    weight: int
+    width: int
+    fs_selection: int
+    mac_style: int
+    # Raw (fvar, STAT) tables of a variable font. They are only decoded when the variations are used.
+    variation_tables: Optional[Tuple[bytes, Optional[bytes]]] = field(default=None, repr=False, compare=False)
+    # Index in the fvar table when the face is a named instance
+    instance_index: Optional[int] = None
+    # OS/2 ulUnicodeRange1-4 (bit N of ulUnicodeRange1 is bit N, bit N of ulUnicodeRange2 is bit 32 + N, ...) and ulCodePageRange1/2
+    unicode_ranges: int = 0
+    code_page_ranges: int = 0
+    _variations: Optional[FontVariations] = field(default=None, init=False, repr=False, compare=False)
+
+    @staticmethod
+    def from_sfnt(path: Path, face: SfntFace) -> "FontFace":
+        weight = 400
+        width = 5
+        fs_selection = 0
+        unicode_ranges = 0
+        code_page_ranges = 0
+        # https://learn.microsoft.com/en-us/typography/opentype/spec/os2
+        os2 = face.get_table("OS/2")
+        if os2 is not None and len(os2) >= 64:
+            weight, width = struct.unpack_from(">HH", os2, 4)
+            fs_selection, = struct.unpack_from(">H", os2, 62)
+            for i, unicode_range in enumerate(struct.unpack_from(">4I", os2, 42)):
+                unicode_ranges |= unicode_range << (32 * i)
+            # The code page ranges have been added in the version 1
+            version, = struct.unpack_from(">H", os2, 0)
+            if version >= 1 and len(os2) >= 86:
+                code_page_range1, code_page_range2 = struct.unpack_from(">II", os2, 78)
+                code_page_ranges = code_page_range1 | code_page_range2 << 32
+
+        mac_style = 0
+        head = face.get_table("head")
+        if head is not None and len(head) >= 46:
+            mac_style, = struct.unpack_from(">H", head, 44)
+
+        variation_tables = None
+        fvar = face.read_table("fvar")
+        if fvar is not None:
+            variation_tables = (fvar, face.read_table("STAT"))
+
+        return FontFace(path, face.face_index, read_names(face), weight, width, fs_selection, mac_style, variation_tables, unicode_ranges=unicode_ranges, code_page_ranges=code_page_ranges)
+
+
+    @staticmethod
+    def from_file(path: Path, named_instances: bool = False) -> List["FontFace"]:
+        # Return every face of the file (there are many in a TrueType/OpenType collection).
+        # When named_instances is True, a variable face is replaced by its named instances, like GDI enumerate them.
+        data = Path(path).read_bytes()
+        faces = [FontFace.from_sfnt(Path(path), SfntFace(data, face_index)) for face_index in range(len(get_face_offsets(data)))]
+        if named_instances:
+            faces = [instance for face in faces for instance in (face.get_named_instances() or [face])]
+        return faces
+
+
+    def get_names(self, name_id: int) -> List[str]:
+        return list(self.names.get(name_id, {}).values())
+
+
+    def get_name(self, name_id: int, language_id: int = ENGLISH_US_LANGUAGE_ID) -> Optional[str]:
+        localized_names = self.names.get(name_id)
+        if not localized_names:
+            return None
+        return localized_names.get(language_id, next(iter(localized_names.values())))
+
+
+    @property
+    def family_name(self) -> Optional[str]:
+        return self.get_name(NameID.FAMILY)
+
+
+    @property
+    def full_name(self) -> Optional[str]:
+        return self.get_name(NameID.FULL_NAME)
+
+
+    @property
+    def is_italic(self) -> bool:
+        return bool(self.fs_selection & FS_SELECTION_ITALIC or self.mac_style & MAC_STYLE_ITALIC)
+
+
+    @property
+    def is_oblique(self) -> bool:
+        return bool(self.fs_selection & FS_SELECTION_OBLIQUE)
+
+
+    @property
+    def charset_mask(self) -> int:
+        # Bit N is set when the face support the charset N (see FontCatalogEntry.get_charset_bit)
+        charset_mask = 0
+        for bit, charset in CODE_PAGE_CHARSETS.items():
+            if self.code_page_ranges & (1 << bit):
+                charset_mask |= 1 << charset
+        # Like GDI, a face without code page ranges (OS/2 version 0) is considered to be a Latin 1 font
+        if not charset_mask:
+            charset_mask = 1 << CharacterSet.ANSI_CHARSET
+        return charset_mask
+
+
+    @property
+    def charsets(self) -> List[CharacterSet]:
+        return [charset for charset in CharacterSet if self.charset_mask & (1 << charset)]
+
+
+    def supports_unicode_range(self, bit: int) -> bool:
+        # https://learn.microsoft.com/en-us/typography/opentype/spec/os2#ulunicoderange1-bits-031ulunicoderange2-bits-3263ulunicoderange3-bits-6495ulunicoderange4-bits-96127
+        return bool(self.unicode_ranges & (1 << bit))
+
+
+    @property
+    def is_variable(self) -> bool:
+        return self.variation_tables is not None
+
+
+    @property
+    def variations(self) -> Optional[FontVariations]:
+        if self.variation_tables is None:
+            return None
+        if self._variations is None:
+            self._variations = FontVariations.from_tables(*self.variation_tables)
+        return self._variations
+
+
+    def get_named_instances(self) -> List["FontFace"]:
+        # Return a face for each fvar named instance, with its effective weight, width, italic and names
+        variations = self.variations
+        if variations is None or self.instance_index is not None:
+            return []
+        return [self._create_named_instance(variations, instance_index, instance) for instance_index, instance in enumerate(variations.instances)]
+
+
+    def _create_named_instance(self, variations: FontVariations, instance_index: int, instance: NamedInstance) -> "FontFace":
+        weight = instance.weight if instance.weight is not None else self.weight
+        width = instance.width if instance.width is not None else self.width
+        is_italic = instance.is_italic if instance.is_italic is not None else self.is_italic
+
+        typographic_families = self.names.get(NameID.TYPOGRAPHIC_FAMILY) or self.names.get(NameID.FAMILY, {})
+        subfamilies = self.names.get(instance.subfamily_name_id) or self.names.get(variations.elided_fallback_name_id) or {ENGLISH_US_LANGUAGE_ID: "Regular"}
+
+        names: Dict[int, Dict[int, str]] = {
+            NameID.FAMILY: {},
+            NameID.SUBFAMILY: {},
+            NameID.FULL_NAME: {},
+            NameID.TYPOGRAPHIC_FAMILY: dict(typographic_families),
+            NameID.TYPOGRAPHIC_SUBFAMILY: dict(subfamilies),
+        }
+        default_family = typographic_families.get(ENGLISH_US_LANGUAGE_ID, next(iter(typographic_families.values()), ""))
+        for language_id, subfamily in subfamilies.items():
+            family = typographic_families.get(language_id, default_family)
+            # Like GDI, "Bahnschrift SemiBold Italic" has the family "Bahnschrift SemiBold" and the style "Italic"
+            words = subfamily.split()
+            style_words = [word for word in words if word in RIBBI_STYLE_WORDS]
+            family_words = [word for word in words if word not in RIBBI_STYLE_WORDS and word != "Regular"]
+            names[NameID.FAMILY][language_id] = " ".join([family] + family_words)
+            names[NameID.SUBFAMILY][language_id] = " ".join(style_words) or "Regular"
+            names[NameID.FULL_NAME][language_id] = family if subfamily == "Regular" else f"{family} {subfamily}"
+        if instance.postscript_name_id is not None and instance.postscript_name_id in self.names:
+            names[NameID.POSTSCRIPT_NAME] = dict(self.names[instance.postscript_name_id])
+
+        is_bold = "Bold" in names[NameID.SUBFAMILY].get(ENGLISH_US_LANGUAGE_ID, next(iter(names[NameID.SUBFAMILY].values())))
+        fs_selection = self.fs_selection & ~(FS_SELECTION_ITALIC | FS_SELECTION_BOLD | FS_SELECTION_REGULAR)
+        fs_selection |= (FS_SELECTION_ITALIC if is_italic else 0) | (FS_SELECTION_BOLD if is_bold else 0)
+        if not is_italic and not is_bold:
+            fs_selection |= FS_SELECTION_REGULAR
+        mac_style = (self.mac_style & ~(MAC_STYLE_BOLD | MAC_STYLE_ITALIC)) | (MAC_STYLE_BOLD if is_bold else 0) | (MAC_STYLE_ITALIC if is_italic else 0)
+
+        named_instance = replace(self, names=names, weight=weight, width=width, fs_selection=fs_selection, mac_style=mac_style, instance_index=instance_index)
+        # The instances share the decoded tables of their font
+        named_instance._variations = variations
+        return named_instance
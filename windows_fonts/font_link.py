@@ -0,0 +1,229 @@
+import json
+import re
+from .logfont import LOGFONTW
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+__all__ = [
+    "FontLinkEntry",
+    "LinkedFace",
+    "SystemLink",
+    "FontLinkResolver",
+]
+
+SYSTEM_LINK_KEY = r"HKEY_LOCAL_MACHINE\SOFTWARE\Microsoft\Windows NT\CurrentVersion\FontLink\SystemLink"
+REG_VALUE_PATTERN = re.compile(r'^"((?:[^"\\]|\\.)*)"=hex\(7\):(.*)$', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class FontLinkEntry:
+    # One string of a SystemLink value: "file[,face name[,scale x,scale y]]"
+    file_name: str
+    face_name: Optional[str] = None
+    scale: Optional[Tuple[int, int]] = None
+
+    @staticmethod
+    def parse(value: str) -> "FontLinkEntry":
+        parts = [part.strip() for part in value.split(",")]
+        face_name = parts[1] if len(parts) > 1 and parts[1] else None
+        scale = None
+        if len(parts) >= 4 and parts[2].isdigit() and parts[3].isdigit():
+            scale = (int(parts[2]), int(parts[3]))
+        return FontLinkEntry(parts[0], face_name, scale)
+
+
+@dataclass(frozen=True)
+class LinkedFace:
+    path: Path
+    face_index: int
+    # None for the base face
+    entry: Optional[FontLinkEntry] = None
+
+
+class SystemLink():
+    # The FontLink\SystemLink values: base face name -> linked fonts, in the order GDI try them
+
+    def __init__(self, links: Dict[str, List[FontLinkEntry]]) -> None:
+        # GDI compare the face names case-insensitively
+        self.links = {face_name.casefold(): entries for face_name, entries in links.items()}
+
+
+    def __len__(self) -> int:
+        return len(self.links)
+
+
+    def get_entries(self, face_name: str) -> List[FontLinkEntry]:
+        return self.links.get(face_name.casefold(), [])
+
+
+    @staticmethod
+    def from_values(values: Dict[str, Iterable[str]]) -> "SystemLink":
+        return SystemLink({face_name: [FontLinkEntry.parse(value) for value in strings if value] for face_name, strings in values.items()})
+
+
+    @staticmethod
+    def load_json(path: Path) -> "SystemLink":
+        # {"Segoe UI": ["TAHOMA.TTF,Tahoma", "MSGOTHIC.TTC,MS UI Gothic", ...], ...}
+        with open(path, "r", encoding="utf-8") as file:
+            data: Dict[str, Any] = json.load(file)
+        return SystemLink.from_values(data)
+
+
+    @staticmethod
+    def load_reg(path: Path) -> "SystemLink":
+        # File exported by regedit. The REG_MULTI_SZ values are written as hex(7) UTF-16LE bytes, split on many lines.
+        data = Path(path).read_bytes()
+        text = data.decode("utf-16") if data[:2] in (b"\xff\xfe", b"\xfe\xff") else data.decode("utf-8-sig")
+
+        lines: List[str] = []
+        for line in text.splitlines():
+            if lines and lines[-1].endswith("\\"):
+                lines[-1] = lines[-1][:-1] + line.strip()
+            else:
+                lines.append(line.strip())
+
+        values: Dict[str, List[str]] = {}
+        in_system_link = False
+        has_keys = False
+        for line in lines:
+            if line.startswith("[") and line.endswith("]"):
+                has_keys = True
+                in_system_link = line[1:-1].casefold() == SYSTEM_LINK_KEY.casefold()
+                continue
+            if has_keys and not in_system_link:
+                continue
+
+            match = REG_VALUE_PATTERN.match(line)
+            if match is None:
+                continue
+            face_name = re.sub(r"\\(.)", r"\1", match.group(1))
+            hex_bytes = bytes(int(byte, 16) for byte in match.group(2).split(",") if byte.strip())
+            values[face_name] = hex_bytes.decode("utf-16-le").split("\0")
+        return SystemLink.from_values(values)
+
+
+    @staticmethod
+    def load(path: Path) -> "SystemLink":
+        if Path(path).suffix.lower() == ".reg":
+            return SystemLink.load_reg(path)
+        return SystemLink.load_json(path)
+
+
+    @staticmethod
+    def from_registry() -> "SystemLink":
+        # Only on Windows
+        import winreg
+
+        values: Dict[str, List[str]] = {}
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, SYSTEM_LINK_KEY.split("\\", 1)[1]) as key:
+            i = 0
+            while True:
+                try:
+                    face_name, value, value_type = winreg.EnumValue(key, i)
+                except OSError:
+                    break
+                if value_type == winreg.REG_MULTI_SZ:
+                    values[face_name] = value
+                i += 1
+        return SystemLink.from_values(values)
+
+
+class FontLinkResolver():
+    # Resolve the fallback chain of a LOGFONTW: the selected face, then every SystemLink font of its family.
+    # Like GDI, the links are the ones of the face which has been selected, not of the requested face name (which can be substituted).
+    # The index can be a FontFaceStore or an IndexSnapshot. The selected face come from base_resolver (for example
+    # FontSession.get_font_face_from_logfont or ResolutionReplayer.get_font_face_from_logfont), or else from the index.
+    # The chains are memoized per base face, so clear_cache() must be called when the index or the SystemLink change.
+
+    def __init__(self, system_link: SystemLink, index: Any, base_resolver: Optional[Callable[[LOGFONTW], Optional[Tuple[Path, int]]]] = None) -> None:
+        self.system_link = system_link
+        self.index = index
+        self.base_resolver = base_resolver
+        self.chains: Dict[Tuple[Optional[Path], int, str], List[LinkedFace]] = {}
+        # LOGFONTW key -> face found in the index, when there isn't any base_resolver
+        self.base_faces: Dict[bytes, Optional[Tuple[Path, int]]] = {}
+        self.unresolved_entries: Dict[FontLinkEntry, None] = {}
+        self._rows_by_file_name: Optional[Dict[str, List[Any]]] = None
+
+
+    def clear_cache(self) -> None:
+        self.chains.clear()
+        self.base_faces.clear()
+        self.unresolved_entries.clear()
+        self._rows_by_file_name = None
+
+
+    def get_fallback_chain(self, lf: LOGFONTW) -> List[LinkedFace]:
+        base_face = self.base_resolver(lf) if self.base_resolver is not None else self._find_base_face(lf)
+        base_path, base_face_index = base_face if base_face is not None else (None, 0)
+
+        family_name = lf.lfFaceName if base_path is None else self._get_family_name(base_path, base_face_index, lf.lfFaceName)
+        key = (base_path, base_face_index, family_name.casefold())
+        chain = self.chains.get(key)
+        if chain is None:
+            chain = [] if base_path is None else [LinkedFace(base_path, base_face_index)]
+            seen = {(face.path, face.face_index) for face in chain}
+            for entry in self.system_link.get_entries(family_name):
+                linked_face = self._resolve_entry(entry)
+                if linked_face is None:
+                    self.unresolved_entries[entry] = None
+                elif (linked_face.path, linked_face.face_index) not in seen:
+                    seen.add((linked_face.path, linked_face.face_index))
+                    chain.append(linked_face)
+            self.chains[key] = chain
+        return list(chain)
+
+
+    def get_fallback_paths(self, lf: LOGFONTW) -> List[Path]:
+        # Every file that a render with this LOGFONTW can touch
+        return list(dict.fromkeys(face.path for face in self.get_fallback_chain(lf)))
+
+
+    def _find_base_face(self, lf: LOGFONTW) -> Optional[Tuple[Path, int]]:
+        # Nearest weight with the same italic. It is only an approximation of the GDI mapper.
+        key = lf.get_key()
+        if key in self.base_faces:
+            return self.base_faces[key]
+
+        rows = [row for row in self.index.find(lf.lfFaceName) if row.path is not None]
+        base_face = None
+        if rows:
+            weight = lf.lfWeight or 400
+            row = min(rows, key=lambda row: (row.is_italic != bool(lf.lfItalic), abs(row.weight - weight), row.face_index))
+            base_face = (row.path, row.face_index)
+        self.base_faces[key] = base_face
+        return base_face
+
+
+    def _get_family_name(self, path: Path, face_index: int, default: str) -> str:
+        # Family name of the selected face. The path may come from another copy of the file, so only its name is compared.
+        rows = [row for row in self._get_rows_by_file_name(path.name) if row.face_index == face_index]
+        if not rows:
+            return default
+        return min(rows, key=lambda row: row.path != path).family_name
+
+
+    def _get_rows_by_file_name(self, file_name: str) -> List[Any]:
+        if self._rows_by_file_name is None:
+            self._rows_by_file_name = {}
+            for row in self.index:
+                if row.path is not None:
+                    self._rows_by_file_name.setdefault(row.path.name.casefold(), []).append(row)
+        return self._rows_by_file_name.get(file_name.casefold(), [])
+
+
+    def _resolve_entry(self, entry: FontLinkEntry) -> Optional[LinkedFace]:
+        # The file name is authoritative. The face name select the face in a collection.
+        rows = self._get_rows_by_file_name(Path(entry.file_name).name)
+        if entry.face_name is not None:
+            named_rows = [row for row in rows if row.family_name.casefold() == entry.face_name.casefold()]
+            if not named_rows and not rows:
+                # The file may have been installed under another name
+                named_rows = [row for row in self.index.find(entry.face_name) if row.path is not None]
+            rows = named_rows or rows
+        if not rows:
+            return None
+
+        row = min(rows, key=lambda row: (row.weight != 400, row.is_italic, row.face_index))
+        return LinkedFace(row.path, row.face_index, entry)
@@ -0,0 +1,130 @@
+import struct
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+__all__ = [
+    "VariationAxis",
+    "NamedInstance",
+    "FontVariations",
+]
+
+# https://learn.microsoft.com/en-us/typography/opentype/spec/fvar
+FVAR_HEADER_FORMAT = struct.Struct(">HHHHHHHH")
+AXIS_RECORD_FORMAT = struct.Struct(">4siiiHH")
+# https://learn.microsoft.com/en-us/typography/opentype/spec/stat
+STAT_HEADER_FORMAT = struct.Struct(">HHHHIHI")
+
+AXIS_FLAG_HIDDEN = 0x0001
+DEFAULT_ELIDED_FALLBACK_NAME_ID = 2
+
+# https://learn.microsoft.com/en-us/typography/opentype/spec/os2#uswidthclass
+WIDTH_CLASS_PERCENTAGES = [50, 62.5, 75, 87.5, 100, 112.5, 125, 150, 200]
+
+
+def from_fixed(value: int) -> float:
+    # 16.16 fixed-point number
+    return value / 0x10000
+
+
+@dataclass(frozen=True)
+class VariationAxis:
+    tag: str
+    min_value: float
+    default_value: float
+    max_value: float
+    flags: int
+    name_id: int
+
+    @property
+    def is_hidden(self) -> bool:
+        return bool(self.flags & AXIS_FLAG_HIDDEN)
+
+
+@dataclass(frozen=True)
+class NamedInstance:
+    subfamily_name_id: int
+    flags: int
+    coordinates: Dict[str, float]
+    postscript_name_id: Optional[int] = None
+
+    @property
+    def weight(self) -> Optional[int]:
+        # Like usWeightClass, the weight must be between 1 and 1000
+        if "wght" not in self.coordinates:
+            return None
+        return min(max(round(self.coordinates["wght"]), 1), 1000)
+
+
+    @property
+    def width(self) -> Optional[int]:
+        # Return the nearest usWidthClass of the wdth axis, which is a percentage of the normal width
+        if "wdth" not in self.coordinates:
+            return None
+        percentage = self.coordinates["wdth"]
+        return min(range(len(WIDTH_CLASS_PERCENTAGES)), key=lambda i: abs(WIDTH_CLASS_PERCENTAGES[i] - percentage)) + 1
+
+
+    @property
+    def is_italic(self) -> Optional[bool]:
+        # A negative slant lean to the right
+        if "ital" in self.coordinates:
+            return self.coordinates["ital"] >= 1
+        if "slnt" in self.coordinates:
+            return self.coordinates["slnt"] < 0
+        return None
+
+
+class FontVariations():
+    # Decoded fvar (and STAT) tables of a variable font
+
+    def __init__(self, axes: List[VariationAxis], instances: List[NamedInstance], elided_fallback_name_id: int = DEFAULT_ELIDED_FALLBACK_NAME_ID) -> None:
+        self.axes = axes
+        self.instances = instances
+        self.elided_fallback_name_id = elided_fallback_name_id
+
+
+    @staticmethod
+    def from_tables(fvar: bytes, stat: Optional[bytes] = None) -> "FontVariations":
+        if len(fvar) < FVAR_HEADER_FORMAT.size:
+            raise ValueError("The fvar table is too small")
+
+        major_version, _, axes_offset, _, axis_count, axis_size, instance_count, instance_size = FVAR_HEADER_FORMAT.unpack_from(fvar, 0)
+        if major_version != 1:
+            raise ValueError(f"The fvar version {major_version} isn't supported")
+
+        axes = []
+        for i in range(axis_count):
+            tag, min_value, default_value, max_value, flags, name_id = AXIS_RECORD_FORMAT.unpack_from(fvar, axes_offset + i * axis_size)
+            axes.append(VariationAxis(tag.decode("latin-1"), from_fixed(min_value), from_fixed(default_value), from_fixed(max_value), flags, name_id))
+
+        # The postScriptNameID is only present when the instances are 2 bytes bigger
+        has_postscript_name_id = instance_size >= axis_count * 4 + 6
+        instances_offset = axes_offset + axis_count * axis_size
+        instances = []
+        for i in range(instance_count):
+            offset = instances_offset + i * instance_size
+            subfamily_name_id, flags = struct.unpack_from(">HH", fvar, offset)
+            coordinates = struct.unpack_from(f">{axis_count}i", fvar, offset + 4)
+            postscript_name_id = None
+            if has_postscript_name_id:
+                postscript_name_id, = struct.unpack_from(">H", fvar, offset + 4 + axis_count * 4)
+                # 0xFFFF mean that the instance doesn't have a PostScript name
+                if postscript_name_id == 0xFFFF:
+                    postscript_name_id = None
+            instances.append(NamedInstance(subfamily_name_id, flags, {axis.tag: from_fixed(coordinate) for axis, coordinate in zip(axes, coordinates)}, postscript_name_id))
+
+        elided_fallback_name_id = DEFAULT_ELIDED_FALLBACK_NAME_ID
+        if stat is not None and len(stat) >= STAT_HEADER_FORMAT.size + 2:
+            stat_major_version, stat_minor_version = struct.unpack_from(">HH", stat, 0)
+            # The elidedFallbackNameID has been added in the version 1.1
+            if stat_major_version == 1 and stat_minor_version >= 1:
+                elided_fallback_name_id, = struct.unpack_from(">H", stat, STAT_HEADER_FORMAT.size)
+
+        return FontVariations(axes, instances, elided_fallback_name_id)
+
+
+    def get_axis(self, tag: str) -> Optional[VariationAxis]:
+        for axis in self.axes:
+            if axis.tag == tag:
+                return axis
+        return None
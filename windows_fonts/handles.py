@@ -0,0 +1,224 @@
+import threading
+from .gdi import GDI
+from .logfont import LOGFONTW
+from .kernel32 import Kernel32
+from .user32 import User32
+from collections import OrderedDict
+from contextlib import contextmanager
+from ctypes import byref, wintypes
+from typing import Dict, Iterator, List, Optional
+
+__all__ = [
+    "DeviceContext",
+    "FontHandle",
+    "SelectedObject",
+    "GdiHandlePool",
+    "get_process_gdi_object_count",
+]
+
+
+def get_process_gdi_object_count(peak: bool = False) -> int:
+    # Count every GDI object of the process, not only the ones created by this module
+    user32 = User32()
+    kernel32 = Kernel32()
+    return user32.GetGuiResources(kernel32.GetCurrentProcess(), user32.GR_GDIOBJECTS_PEAK if peak else user32.GR_GDIOBJECTS)
+
+
+class DeviceContext():
+    # Memory DC which is deleted by close(), at the end of a with statement or, as a last resort, by the garbage collector
+    live_count = 0
+    _lock = threading.Lock()
+
+    def __init__(self, gdi: GDI) -> None:
+        self.gdi = gdi
+        self.handle: Optional[wintypes.HDC] = gdi.CreateCompatibleDC(None)
+        with DeviceContext._lock:
+            DeviceContext.live_count += 1
+
+
+    def __enter__(self) -> wintypes.HDC:
+        return self.handle
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+    def close(self) -> None:
+        if self.handle is not None:
+            handle, self.handle = self.handle, None
+            with DeviceContext._lock:
+                DeviceContext.live_count -= 1
+            self.gdi.DeleteDC(handle)
+
+
+class FontHandle():
+    # HFONT which is deleted by close(), at the end of a with statement or, as a last resort, by the garbage collector.
+    # It must not be selected in a DC when it is closed (see SelectedObject).
+    live_count = 0
+    _lock = threading.Lock()
+
+    def __init__(self, gdi: GDI, lf: LOGFONTW) -> None:
+        self.gdi = gdi
+        self.handle: Optional[wintypes.HFONT] = gdi.CreateFontIndirectW(byref(lf))
+        with FontHandle._lock:
+            FontHandle.live_count += 1
+
+
+    def __enter__(self) -> wintypes.HFONT:
+        return self.handle
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+    def close(self) -> None:
+        if self.handle is not None:
+            handle, self.handle = self.handle, None
+            with FontHandle._lock:
+                FontHandle.live_count -= 1
+            self.gdi.DeleteObject(handle)
+
+
+class SelectedObject():
+    # Select an object in a DC and restore the previous one on exit, so the object can then be deleted safely
+
+    def __init__(self, gdi: GDI, dc: wintypes.HDC, handle: wintypes.HGDIOBJ) -> None:
+        self.gdi = gdi
+        self.dc = dc
+        self.handle = handle
+        self.previous_handle: Optional[wintypes.HGDIOBJ] = None
+
+
+    def __enter__(self) -> wintypes.HGDIOBJ:
+        self.previous_handle = self.gdi.SelectObject(self.dc, self.handle)
+        return self.handle
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.gdi.SelectObject(self.dc, self.previous_handle)
+
+
+class GdiHandlePool():
+    # Reuse a few DCs and the HFONTs of the most recent LOGFONTW, so a long-running process keep a flat GDI object count.
+    # A font which is in use is never evicted, so the pool can temporarily hold more than max_fonts fonts.
+
+    def __init__(self, gdi: Optional[GDI] = None, max_dcs: int = 4, max_fonts: int = 64) -> None:
+        self.gdi = gdi or GDI()
+        self.max_dcs = max_dcs
+        self.max_fonts = max_fonts
+        self.lock = threading.Lock()
+        self.free_dcs: List[DeviceContext] = []
+        self.fonts: "OrderedDict[bytes, FontHandle]" = OrderedDict()
+        self.fonts_in_use: Dict[bytes, int] = {}
+        self.font_hits = 0
+        self.font_misses = 0
+        self.closed = False
+
+
+    def __enter__(self) -> "GdiHandlePool":
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+    @contextmanager
+    def dc(self) -> Iterator[wintypes.HDC]:
+        with self.lock:
+            device_context = self.free_dcs.pop() if self.free_dcs else None
+        if device_context is None:
+            device_context = DeviceContext(self.gdi)
+
+        try:
+            yield device_context.handle
+        finally:
+            with self.lock:
+                if not self.closed and len(self.free_dcs) < self.max_dcs:
+                    self.free_dcs.append(device_context)
+                    device_context = None
+            if device_context is not None:
+                device_context.close()
+
+
+    @contextmanager
+    def font(self, lf: LOGFONTW) -> Iterator[wintypes.HFONT]:
+        key = lf.get_key()
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("The GdiHandlePool is closed")
+
+            font_handle = self.fonts.get(key)
+            if font_handle is None:
+                self.font_misses += 1
+                font_handle = FontHandle(self.gdi, lf)
+                self.fonts[key] = font_handle
+            else:
+                self.font_hits += 1
+                self.fonts.move_to_end(key)
+            self.fonts_in_use[key] = self.fonts_in_use.get(key, 0) + 1
+
+        try:
+            yield font_handle.handle
+        finally:
+            with self.lock:
+                self.fonts_in_use[key] -= 1
+                if not self.fonts_in_use[key]:
+                    del self.fonts_in_use[key]
+                evicted = self._evict_fonts()
+            for evicted_handle in evicted:
+                evicted_handle.close()
+
+
+    def _evict_fonts(self) -> List[FontHandle]:
+        # Must be called with the lock
+        evicted = []
+        for key in list(self.fonts):
+            if len(self.fonts) <= self.max_fonts and not self.closed:
+                break
+            if key not in self.fonts_in_use:
+                evicted.append(self.fonts.pop(key))
+        return evicted
+
+
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+            free_dcs, self.free_dcs = self.free_dcs, []
+            evicted = self._evict_fonts()
+        for device_context in free_dcs:
+            device_context.close()
+        for font_handle in evicted:
+            font_handle.close()
+
+
+    def get_metrics(self) -> Dict[str, int]:
+        with self.lock:
+            metrics = {
+                "live_dcs": DeviceContext.live_count,
+                "live_fonts": FontHandle.live_count,
+                "pooled_dcs": len(self.free_dcs),
+                "pooled_fonts": len(self.fonts),
+                "fonts_in_use": len(self.fonts_in_use),
+                "font_hits": self.font_hits,
+                "font_misses": self.font_misses,
+            }
+        metrics["process_gdi_objects"] = get_process_gdi_object_count()
+        metrics["process_gdi_objects_peak"] = get_process_gdi_object_count(peak=True)
+        return metrics
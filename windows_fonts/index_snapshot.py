@@ -0,0 +1,402 @@
+import glob
+import mmap
+import os
+import struct
+import zlib
+from .face_store import FontFaceStore
+from .font_catalog import FontCatalogEntry
+from .logfont import CharacterSet
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+__all__ = [
+    "IndexSnapshotRow",
+    "IndexSnapshot",
+]
+
+# Layout (little-endian). Everything is read in place through a read-only mmap, so the pages are shared by every process.
+#   header            HEADER_FORMAT
+#   records           face_count * RECORD_FORMAT, sorted by casefolded family name. The instance index is NO_INSTANCE for the default instance.
+#   charset masks     charset_mask_count * 32 bytes (256 bits, one per charset)
+#   unicode ranges    unicode_range_count * 16 bytes (the 128 bits of OS/2 ulUnicodeRange1-4)
+#   family hash table bucket_count * BUCKET_FORMAT, open addressing with linear probing on fnv1a_32(casefolded family)
+#   string pool       (uint16 length, UTF-8 bytes)*
+# The checksum is the CRC-32 of everything after the header.
+# On Windows, a file mapped by a process cannot be replaced or deleted. So when the readers are long-lived, the snapshot is
+# written with write_version() as "<path>.<generation>", and the readers open (and later switch to) the latest generation.
+MAGIC = b"WFIDX\x00\x00\x00"
+VERSION = 4
+HEADER_FORMAT = struct.Struct("<8sIIIIIIIIIIII")
+RECORD_FORMAT = struct.Struct("<4I2H3BxIIH2x")
+BUCKET_FORMAT = struct.Struct("<4I")
+STRING_LENGTH_FORMAT = struct.Struct("<H")
+CHARSET_MASK_SIZE = 32
+UNICODE_RANGES_SIZE = 16
+EMPTY_BUCKET = 0xFFFFFFFF
+FLAG_ITALIC = 1 << 0
+NO_INSTANCE = 0xFFFF
+
+
+def fnv1a_32(data: bytes) -> int:
+    # Unlike hash(), it is stable between processes
+    value = 0x811C9DC5
+    for byte in data:
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return value
+
+
+class IndexSnapshotRow():
+    # Lazy view over one record. Only the fields that are read are decoded.
+    __slots__ = ("snapshot", "index", "fields")
+
+    def __init__(self, snapshot: "IndexSnapshot", index: int) -> None:
+        self.snapshot = snapshot
+        self.index = index
+        self.fields = RECORD_FORMAT.unpack_from(snapshot.data, snapshot.record_offset + index * RECORD_FORMAT.size)
+
+
+    def __repr__(self) -> str:
+        return f"IndexSnapshotRow({self.full_name!r}, weight={self.weight}, is_italic={self.is_italic})"
+
+
+    @property
+    def family_name(self) -> str:
+        return self.snapshot.get_string(self.fields[0])
+
+
+    @property
+    def style(self) -> str:
+        return self.snapshot.get_string(self.fields[1])
+
+
+    @property
+    def full_name(self) -> str:
+        return self.snapshot.get_string(self.fields[2])
+
+
+    @property
+    def path(self) -> Optional[Path]:
+        path = self.snapshot.get_string(self.fields[3])
+        return Path(path) if path else None
+
+
+    @property
+    def face_index(self) -> int:
+        return self.fields[4]
+
+
+    @property
+    def weight(self) -> int:
+        return self.fields[5]
+
+
+    @property
+    def is_italic(self) -> bool:
+        return bool(self.fields[6] & FLAG_ITALIC)
+
+
+    @property
+    def pitch_and_family(self) -> int:
+        return self.fields[7]
+
+
+    @property
+    def font_type(self) -> int:
+        return self.fields[8]
+
+
+    @property
+    def charset_mask(self) -> int:
+        return self.snapshot.get_charset_mask(self.fields[9])
+
+
+    @property
+    def unicode_ranges(self) -> int:
+        return self.snapshot.get_unicode_ranges(self.fields[10])
+
+
+    @property
+    def instance_index(self) -> Optional[int]:
+        return None if self.fields[11] == NO_INSTANCE else self.fields[11]
+
+
+    def to_catalog_entry(self) -> FontCatalogEntry:
+        return FontCatalogEntry(self.family_name, self.full_name, self.style, self.weight, self.is_italic, self.pitch_and_family, self.font_type, self.charset_mask)
+
+
+class IndexSnapshot():
+
+    def __init__(self, path: Path) -> None:
+        # Only the header is read, so the time to open a snapshot doesn't depend on its size
+        self.path = Path(path)
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.data) < HEADER_FORMAT.size:
+            self.data.close()
+            raise ValueError(f"{path} is too small to be an index snapshot")
+
+        (
+            magic,
+            version,
+            self.face_count,
+            self.record_offset,
+            self.charset_mask_offset,
+            self.charset_mask_count,
+            self.unicode_range_offset,
+            self.unicode_range_count,
+            self.bucket_offset,
+            self.bucket_count,
+            self.string_offset,
+            self.string_size,
+            self.checksum,
+        ) = HEADER_FORMAT.unpack_from(self.data, 0)
+
+        if magic != MAGIC:
+            self.data.close()
+            raise ValueError(f"{path} isn't an index snapshot")
+        if version != VERSION:
+            self.data.close()
+            raise ValueError(f"{path} has the version {version}, but only the version {VERSION} is supported")
+
+
+    def __enter__(self) -> "IndexSnapshot":
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+    def __len__(self) -> int:
+        return self.face_count
+
+
+    def __getitem__(self, index: int) -> IndexSnapshotRow:
+        if not 0 <= index < self.face_count:
+            raise IndexError(f"The face {index} doesn't exist")
+        return IndexSnapshotRow(self, index)
+
+
+    def __iter__(self) -> Iterator[IndexSnapshotRow]:
+        return (IndexSnapshotRow(self, index) for index in range(self.face_count))
+
+
+    def close(self) -> None:
+        self.data.close()
+
+
+    def verify(self) -> None:
+        # O(size of the file), so it isn't done when opening the snapshot
+        if zlib.crc32(memoryview(self.data)[HEADER_FORMAT.size:]) != self.checksum:
+            raise ValueError("The checksum of the index snapshot doesn't match. The file is corrupted")
+
+
+    def get_string(self, offset: int) -> str:
+        length, = STRING_LENGTH_FORMAT.unpack_from(self.data, self.string_offset + offset)
+        start = self.string_offset + offset + STRING_LENGTH_FORMAT.size
+        return self.data[start:start + length].decode("utf-8")
+
+
+    def get_charset_mask(self, index: int) -> int:
+        start = self.charset_mask_offset + index * CHARSET_MASK_SIZE
+        return int.from_bytes(self.data[start:start + CHARSET_MASK_SIZE], "little")
+
+
+    def get_unicode_ranges(self, index: int) -> int:
+        start = self.unicode_range_offset + index * UNICODE_RANGES_SIZE
+        return int.from_bytes(self.data[start:start + UNICODE_RANGES_SIZE], "little")
+
+
+    def get_family_range(self, family_name: str) -> Tuple[int, int]:
+        # Return the (first record, record count) of the family
+        if self.bucket_count == 0:
+            return (0, 0)
+
+        key = family_name.casefold().encode("utf-8")
+        key_hash = fnv1a_32(key)
+        bucket = key_hash & (self.bucket_count - 1)
+        while True:
+            bucket_hash, key_offset, first_record, record_count = BUCKET_FORMAT.unpack_from(self.data, self.bucket_offset + bucket * BUCKET_FORMAT.size)
+            if key_offset == EMPTY_BUCKET:
+                return (0, 0)
+            if bucket_hash == key_hash and self.get_string(key_offset).encode("utf-8") == key:
+                return (first_record, record_count)
+            bucket = (bucket + 1) & (self.bucket_count - 1)
+
+
+    def find(self, family_name: Optional[str] = None, weight: Optional[int] = None, is_italic: Optional[bool] = None, charset: Optional[int] = None, min_weight: Optional[int] = None, max_weight: Optional[int] = None, unicode_range: Optional[int] = None) -> List[IndexSnapshotRow]:
+        # Without a family name, every record is scanned in one pass. The masks are tested once per distinct mask.
+        if family_name is None:
+            first_record, record_count = 0, self.face_count
+        else:
+            first_record, record_count = self.get_family_range(family_name)
+
+        charset_mask_ids = None
+        if charset is not None and charset != CharacterSet.DEFAULT_CHARSET:
+            charset_bit = FontCatalogEntry.get_charset_bit(charset)
+            charset_mask_ids = {mask_id for mask_id in range(self.charset_mask_count) if self.get_charset_mask(mask_id) & charset_bit}
+
+        unicode_range_ids = None
+        if unicode_range is not None:
+            unicode_range_ids = {range_id for range_id in range(self.unicode_range_count) if self.get_unicode_ranges(range_id) & (1 << unicode_range)}
+
+        # The records are unpacked in place, without copying them out of the mmap
+        rows = []
+        for index in range(first_record, first_record + record_count):
+            fields = RECORD_FORMAT.unpack_from(self.data, self.record_offset + index * RECORD_FORMAT.size)
+            record_weight = fields[5]
+            if weight is not None and record_weight != weight:
+                continue
+            if min_weight is not None and record_weight < min_weight:
+                continue
+            if max_weight is not None and record_weight > max_weight:
+                continue
+            if is_italic is not None and bool(fields[6] & FLAG_ITALIC) != is_italic:
+                continue
+            if charset_mask_ids is not None and fields[9] not in charset_mask_ids:
+                continue
+            if unicode_range_ids is not None and fields[10] not in unicode_range_ids:
+                continue
+            rows.append(IndexSnapshotRow(self, index))
+        return rows
+
+
+    @staticmethod
+    def write(store: FontFaceStore, path: Path) -> None:
+        strings = bytearray()
+        string_offsets: Dict[str, int] = {}
+
+        def add_string(string: str) -> int:
+            offset = string_offsets.get(string)
+            if offset is None:
+                encoded = string.encode("utf-8")
+                offset = len(strings)
+                strings.extend(STRING_LENGTH_FORMAT.pack(len(encoded)))
+                strings.extend(encoded)
+                string_offsets[string] = offset
+            return offset
+
+        rows = sorted(store, key=lambda row: row.family_name.casefold())
+
+        records = bytearray()
+        families: Dict[str, List[int]] = {}
+        for index, row in enumerate(rows):
+            family_key = row.family_name.casefold()
+            family_range = families.setdefault(family_key, [index, 0])
+            family_range[1] += 1
+
+            path_string = "" if row.path is None else str(row.path)
+            records.extend(RECORD_FORMAT.pack(
+                add_string(row.family_name),
+                add_string(row.style),
+                add_string(row.full_name),
+                add_string(path_string),
+                row.face_index,
+                row.weight,
+                FLAG_ITALIC if row.is_italic else 0,
+                row.pitch_and_family,
+                row.font_type,
+                store.charset_mask_ids[row.index],
+                store.unicode_range_ids[row.index],
+                store.instance_indices[row.index],
+            ))
+
+        charset_masks = b"".join(mask.to_bytes(CHARSET_MASK_SIZE, "little") for mask in store.charset_masks)
+        unicode_ranges = b"".join(ranges.to_bytes(UNICODE_RANGES_SIZE, "little") for ranges in store.unicode_ranges)
+
+        # Keep the load factor under 0.5
+        bucket_count = 1
+        while bucket_count < len(families) * 2:
+            bucket_count *= 2
+        buckets = [(0, EMPTY_BUCKET, 0, 0)] * bucket_count if families else []
+        for family_key, (first_record, record_count) in families.items():
+            key_hash = fnv1a_32(family_key.encode("utf-8"))
+            bucket = key_hash & (bucket_count - 1)
+            while buckets[bucket][1] != EMPTY_BUCKET:
+                bucket = (bucket + 1) & (bucket_count - 1)
+            buckets[bucket] = (key_hash, add_string(family_key), first_record, record_count)
+        hash_table = b"".join(BUCKET_FORMAT.pack(*bucket) for bucket in buckets)
+
+        record_offset = HEADER_FORMAT.size
+        charset_mask_offset = record_offset + len(records)
+        unicode_range_offset = charset_mask_offset + len(charset_masks)
+        bucket_offset = unicode_range_offset + len(unicode_ranges)
+        string_offset = bucket_offset + len(hash_table)
+        body = bytes(records) + charset_masks + unicode_ranges + hash_table + bytes(strings)
+
+        header = HEADER_FORMAT.pack(
+            MAGIC,
+            VERSION,
+            len(rows),
+            record_offset,
+            charset_mask_offset,
+            len(store.charset_masks),
+            unicode_range_offset,
+            len(store.unicode_ranges),
+            bucket_offset,
+            len(buckets),
+            string_offset,
+            len(strings),
+            zlib.crc32(body),
+        )
+
+        # Write next to the destination, then replace it, so a reader never map a partial file
+        temporary_path = Path(f"{path}.tmp")
+        with open(temporary_path, "wb") as file:
+            file.write(header)
+            file.write(body)
+        try:
+            os.replace(temporary_path, path)
+        except OSError:
+            # On Windows, it fail with a PermissionError while a reader map the destination. Use write_version() in that case.
+            temporary_path.unlink()
+            raise
+
+
+    @staticmethod
+    def get_versions(path: Path) -> List[Tuple[int, Path]]:
+        # The (generation, path) of every version written by write_version(), from the oldest to the latest
+        path = Path(path)
+        versions = []
+        for version_path in path.parent.glob(f"{glob.escape(path.name)}.*"):
+            generation = version_path.name[len(path.name) + 1:]
+            if generation.isdigit():
+                versions.append((int(generation), version_path))
+        return sorted(versions)
+
+
+    @staticmethod
+    def get_latest_path(path: Path) -> Optional[Path]:
+        # A long-lived reader can compare it with its snapshot.path to know when to switch to a newer version
+        versions = IndexSnapshot.get_versions(path)
+        return versions[-1][1] if versions else None
+
+
+    @staticmethod
+    def open_latest(path: Path) -> "IndexSnapshot":
+        while True:
+            latest_path = IndexSnapshot.get_latest_path(path)
+            if latest_path is None:
+                raise FileNotFoundError(f"{path} doesn't have any version")
+            try:
+                return IndexSnapshot(latest_path)
+            except FileNotFoundError:
+                # A writer has deleted it after writing a newer version
+                continue
+
+
+    @staticmethod
+    def write_version(store: FontFaceStore, path: Path) -> Path:
+        # Write a new generation, so no mapped file is ever replaced. Only one process must write the versions of a path at a time.
+        versions = IndexSnapshot.get_versions(path)
+        version_path = Path(f"{path}.{versions[-1][0] + 1 if versions else 1}")
+        IndexSnapshot.write(store, version_path)
+
+        # On Windows, the old versions which are still mapped cannot be deleted. A later write_version() delete them.
+        for _, old_path in versions:
+            try:
+                old_path.unlink()
+            except PermissionError:
+                pass
+        return version_path
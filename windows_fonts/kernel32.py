@@ -0,0 +1,13 @@
+from ctypes import windll, wintypes
+
+__all__ = ["Kernel32"]
+
+
+class Kernel32():
+    def __init__(self) -> None:
+        kernel32 = windll.kernel32
+
+        # https://learn.microsoft.com/en-us/windows/win32/api/processthreadsapi/nf-processthreadsapi-getcurrentprocess
+        self.GetCurrentProcess = kernel32.GetCurrentProcess
+        self.GetCurrentProcess.restype = wintypes.HANDLE
+        self.GetCurrentProcess.argtypes = []
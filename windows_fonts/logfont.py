@@ -0,0 +1,205 @@
+import struct
+from ctypes import c_int32, c_ubyte, c_wchar, Structure
+from enum import IntEnum
+
+__all__ = [
+    "Pitch",
+    "Family",
+    "CharacterSet",
+    "OutPrecision",
+    "ClipPrecision",
+    "FontQuality",
+    "LOGFONTW",
+    "TEXTMETRIC",
+    "ENUMLOGFONTEXW",
+    "LOGFONT_KEY_SIZE",
+    "create_logfont_like_vsfilter",
+]
+
+# The structures have the layout of Windows (LONG is 32 bits and WCHAR is UTF-16), but they don't need any Windows binding,
+# so the LOGFONTW keys can be built and read on every OS.
+LOGFONT_KEY_FORMAT = struct.Struct("<5i8B64s")
+LOGFONT_KEY_SIZE = LOGFONT_KEY_FORMAT.size
+
+
+class Pitch(IntEnum):
+    # https://learn.microsoft.com/en-us/openspecs/windows_protocols/ms-wmf/22dbe377-aec4-4669-88e6-b8fdd9351d76
+    DEFAULT_PITCH           = 0
+    FIXED_PITCH             = 1
+    VARIABLE_PITCH          = 2
+
+
+class Family(IntEnum):
+    # https://learn.microsoft.com/en-us/openspecs/windows_protocols/ms-wmf/9a632766-1f1c-4e2b-b1a4-f5b1a45f99ad
+    FF_DONTCARE = 0 << 4
+    FF_ROMAN = 1 << 4
+    FF_SWISS = 2 << 4
+    FF_MODERN = 3 << 4
+    FF_SCRIPT = 4 << 4
+    FF_DECORATIVE = 5 << 4
+
+
+class CharacterSet(IntEnum):
+    # https://learn.microsoft.com/en-us/openspecs/windows_protocols/ms-wmf/0d0b32ac-a836-4bd2-a112-b6000a1b4fc9
+    ANSI_CHARSET = 0x00000000
+    DEFAULT_CHARSET = 0x00000001
+    SYMBOL_CHARSET = 0x00000002
+    MAC_CHARSET = 0x0000004D
+    SHIFTJIS_CHARSET = 0x00000080
+    HANGUL_CHARSET = 0x00000081
+    JOHAB_CHARSET = 0x00000082
+    GB2312_CHARSET = 0x00000086
+    CHINESEBIG5_CHARSET = 0x00000088
+    GREEK_CHARSET = 0x000000A1
+    TURKISH_CHARSET = 0x000000A2
+    VIETNAMESE_CHARSET = 0x000000A3
+    HEBREW_CHARSET = 0x000000B1
+    ARABIC_CHARSET = 0x000000B2
+    BALTIC_CHARSET = 0x000000BA
+    RUSSIAN_CHARSET = 0x000000CC
+    THAI_CHARSET = 0x000000DE
+    EASTEUROPE_CHARSET = 0x000000EE
+    OEM_CHARSET = 0x000000FF
+
+
+class OutPrecision(IntEnum):
+    # https://learn.microsoft.com/en-us/openspecs/windows_protocols/ms-wmf/28ebf288-63cf-4b64-9113-410a63cf792d
+    OUT_DEFAULT_PRECIS = 0x00000000
+    OUT_STRING_PRECIS = 0x00000001
+    OUT_STROKE_PRECIS = 0x00000003
+    OUT_TT_PRECIS = 0x00000004
+    OUT_DEVICE_PRECIS = 0x00000005
+    OUT_RASTER_PRECIS = 0x00000006
+    OUT_TT_ONLY_PRECIS = 0x00000007
+    OUT_OUTLINE_PRECIS = 0x00000008
+    OUT_SCREEN_OUTLINE_PRECIS = 0x00000009
+    OUT_PS_ONLY_PRECIS = 0x0000000A
+
+
+class ClipPrecision(IntEnum):
+    CLIP_DEFAULT_PRECIS   =  0
+    CLIP_CHARACTER_PRECIS =  1
+    CLIP_STROKE_PRECIS    =  2
+    CLIP_MASK             =  0xf
+    CLIP_LH_ANGLES        =  (1<<4)
+    CLIP_TT_ALWAYS        =  (2<<4)
+    CLIP_DFA_DISABLE      =  (4<<4)
+    CLIP_EMBEDDED         =  (8<<4)
+
+
+class FontQuality(IntEnum):
+    # https://learn.microsoft.com/en-us/openspecs/windows_protocols/ms-wmf/9518fece-d2f2-4799-9df6-ba3db1d73371
+    DEFAULT_QUALITY = 0x00
+    DRAFT_QUALITY = 0x01
+    PROOF_QUALITY = 0x02
+    NONANTIALIASED_QUALITY = 0x03
+    ANTIALIASED_QUALITY = 0x04
+    CLEARTYPE_QUALITY = 0x05
+
+
+class LOGFONTW(Structure):
+    # https://learn.microsoft.com/en-us/windows/win32/api/wingdi/ns-wingdi-logfontw
+    _fields_ = [
+        ("lfHeight", c_int32),
+        ("lfWidth", c_int32),
+        ("lfEscapement", c_int32),
+        ("lfOrientation", c_int32),
+        ("lfWeight", c_int32),
+        ("lfItalic", c_ubyte), # Cannot use c_ubyteS on old version of python, see https://github.com/python/cpython/issues/60580
+        ("lfUnderline", c_ubyte),
+        ("lfStrikeOut", c_ubyte),
+        ("lfCharSet", c_ubyte),
+        ("lfOutPrecision", c_ubyte),
+        ("lfClipPrecision", c_ubyte),
+        ("lfQuality", c_ubyte),
+        ("lfPitchAndFamily", c_ubyte),
+        ("lfFaceName", c_wchar * 32),
+    ]
+
+    def __str__(self) -> str:
+        attributes = []
+        for field_name, _ in self._fields_:
+            value = getattr(self, field_name)
+            if field_name == "lfCharSet":
+                value = CharacterSet(value).name
+            elif field_name == "lfPitchAndFamily":
+                family = value & 0b11110000
+                pitch = value & 0b00001111
+                value = f"{Pitch(pitch).name}|{Family(family).name}"
+
+            attributes.append(f"{field_name}: {value}")
+        return "\n".join(attributes)
+
+    def get_key(self) -> bytes:
+        # GDI compare the face name case-insensitively and ignore what follows the null character.
+        # The key is the Windows memory layout of the structure, even on an OS where c_long and c_wchar have another size.
+        return LOGFONT_KEY_FORMAT.pack(
+            self.lfHeight,
+            self.lfWidth,
+            self.lfEscapement,
+            self.lfOrientation,
+            self.lfWeight,
+            self.lfItalic,
+            self.lfUnderline,
+            self.lfStrikeOut,
+            self.lfCharSet,
+            self.lfOutPrecision,
+            self.lfClipPrecision,
+            self.lfQuality,
+            self.lfPitchAndFamily,
+            self.lfFaceName.lower().encode("utf-16-le"),
+        )
+
+    @staticmethod
+    def from_key(key: bytes) -> "LOGFONTW":
+        *fields, face_name = LOGFONT_KEY_FORMAT.unpack(key)
+        return LOGFONTW(*fields, face_name.decode("utf-16-le").split("\0", 1)[0])
+
+
+class TEXTMETRIC(Structure):
+    # https://learn.microsoft.com/en-us/windows/win32/api/wingdi/ns-wingdi-textmetricw
+    _fields_ = [
+        ('tmHeight', c_int32),
+        ('tmAscent', c_int32),
+        ('tmDescent', c_int32),
+        ('tmInternalLeading', c_int32),
+        ('tmExternalLeading', c_int32),
+        ('tmAveCharWidth', c_int32),
+        ('tmMaxCharWidth', c_int32),
+        ('tmWeight', c_int32),
+        ('tmOverhang', c_int32),
+        ('tmDigitizedAspectX', c_int32),
+        ('tmDigitizedAspectY', c_int32),
+        ('tmFirstChar', c_wchar),
+        ('tmLastChar', c_wchar),
+        ('tmDefaultChar', c_wchar),
+        ('tmBreakChar', c_wchar),
+        ('tmItalic', c_ubyte),
+        ('tmUnderlined', c_ubyte),
+        ('tmStruckOut', c_ubyte),
+        ('tmPitchAndFamily', c_ubyte),
+        ('tmCharSet', c_ubyte)
+    ]
+
+
+class ENUMLOGFONTEXW(Structure):
+    # https://learn.microsoft.com/en-us/windows/win32/api/wingdi/ns-wingdi-enumlogfontexw
+    _fields_ = [
+        ("elfLogFont", LOGFONTW),
+        ("elfFullName", c_wchar * 64),
+        ("elfStyle", c_wchar * 32),
+        ("elfScript", c_wchar * 32),
+    ]
+    def __str__(self) -> str:
+        attributes = []
+        for field_name, _ in self._fields_:
+            value = getattr(self, field_name)
+            attributes.append(f"{field_name}: {value}")
+        return "\n".join(attributes)
+
+
+def create_logfont_like_vsfilter(family_name: str, weight: int = 400, is_italic: bool = False, charset: CharacterSet = CharacterSet.DEFAULT_CHARSET) -> LOGFONTW:
+    # From VSFilter
+    #   - https://sourceforge.net/p/guliverkli2/code/HEAD/tree/src/subtitles/RTS.cpp#l45
+    #   - https://sourceforge.net/p/guliverkli2/code/HEAD/tree/src/subtitles/STS.cpp#l2992
+    return LOGFONTW(0, 0, 0, 0, weight, is_italic, 0, 0, charset, OutPrecision.OUT_TT_PRECIS, ClipPrecision.CLIP_DEFAULT_PRECIS, FontQuality.ANTIALIASED_QUALITY, Pitch.DEFAULT_PITCH|Family.FF_DONTCARE, family_name)
@@ -0,0 +1,191 @@
+import heapq
+import struct
+import threading
+from .logfont import LOGFONT_KEY_SIZE, LOGFONTW
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+__all__ = [
+    "QueryLog",
+]
+
+# Layout (little-endian)
+#   header  HEADER_FORMAT (magic, version, capacity, next empty slot)
+#   slots   capacity * (SLOT_COUNT_FORMAT, LOGFONTW key). A count of 0 mean that the slot is empty.
+# A new key take the next empty slot. When every slot is used, it take the slot of the key with the lowest count and
+# start from that count plus its own (the Space-Saving algorithm). A flood of one-off keys then only replace each other,
+# since each of them start above the key it replaced, and a frequent key is only evicted when that many keys come
+# after it. The count of a key which replaced another one is an upper bound of its real count.
+# The slots are rewritten in place, so the file never grow past its capacity.
+MAGIC = b"WFQLOG\x00\x00"
+VERSION = 1
+HEADER_FORMAT = struct.Struct("<8sIII")
+SLOT_COUNT_FORMAT = struct.Struct("<I")
+SLOT_SIZE = SLOT_COUNT_FORMAT.size + LOGFONT_KEY_SIZE
+MAX_COUNT = 0xFFFFFFFF
+
+
+class QueryLog():
+    # Count how often each LOGFONTW is queried. record() only update a dict; the counts are written every
+    # flush_interval records and on close(). Only one process must write to a file at a time.
+
+    def __init__(self, path: Path, capacity: int = 8192, flush_interval: int = 1024) -> None:
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.pending: Dict[bytes, int] = {}
+        self.pending_count = 0
+        # key -> (slot, count) of what is in the file
+        self.slots: Dict[bytes, Tuple[int, int]] = {}
+        self.slot_keys: List[Optional[bytes]] = []
+
+        if self.path.exists() and self.path.stat().st_size > 0:
+            self.file = open(self.path, "r+b")
+            self._load()
+        else:
+            if capacity <= 0:
+                raise ValueError("The capacity must be positive")
+            self.capacity = capacity
+            self.next_slot = 0
+            self.slot_keys = [None] * capacity
+            self.file = open(self.path, "w+b")
+            self.file.write(HEADER_FORMAT.pack(MAGIC, VERSION, self.capacity, self.next_slot))
+            self.file.write(bytes(self.capacity * SLOT_SIZE))
+            self.file.flush()
+
+
+    def __enter__(self) -> "QueryLog":
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+    def _load(self) -> None:
+        data = self.file.read()
+        if len(data) < HEADER_FORMAT.size:
+            self.file.close()
+            raise ValueError(f"{self.path} is too small to be a query log")
+
+        magic, version, self.capacity, self.next_slot = HEADER_FORMAT.unpack_from(data, 0)
+        if magic != MAGIC:
+            self.file.close()
+            raise ValueError(f"{self.path} isn't a query log")
+        if version != VERSION:
+            self.file.close()
+            raise ValueError(f"{self.path} has the version {version}, but only the version {VERSION} is supported")
+        if len(data) != HEADER_FORMAT.size + self.capacity * SLOT_SIZE:
+            self.file.close()
+            raise ValueError(f"{self.path} is truncated")
+
+        self.slot_keys = [None] * self.capacity
+        for slot in range(self.capacity):
+            offset = HEADER_FORMAT.size + slot * SLOT_SIZE
+            count, = SLOT_COUNT_FORMAT.unpack_from(data, offset)
+            if count:
+                key = data[offset + SLOT_COUNT_FORMAT.size:offset + SLOT_SIZE]
+                self.slots[key] = (slot, count)
+                self.slot_keys[slot] = key
+        # The slots are filled in order and never emptied
+        self.next_slot = self.slot_keys.index(None) if None in self.slot_keys else self.capacity
+
+
+    def record(self, lf: LOGFONTW) -> None:
+        self.record_key(lf.get_key())
+
+
+    def record_key(self, key: bytes) -> None:
+        with self.lock:
+            self.pending[key] = self.pending.get(key, 0) + 1
+            self.pending_count += 1
+            if self.pending_count < self.flush_interval:
+                return
+            self._flush()
+
+
+    def flush(self) -> None:
+        with self.lock:
+            self._flush()
+
+
+    def _flush(self) -> None:
+        # Must be called with the lock
+        if not self.pending:
+            return
+
+        written_slots: Dict[int, bytes] = {}
+        new_keys: List[bytes] = []
+        for key, count in self.pending.items():
+            slot_count = self.slots.get(key)
+            if slot_count is None:
+                new_keys.append(key)
+            else:
+                slot, previous_count = slot_count
+                self.slots[key] = (slot, min(previous_count + count, MAX_COUNT))
+                written_slots[slot] = key
+
+        if new_keys:
+            # When there are more new keys than slots, only the most frequent ones are kept
+            new_keys.sort(key=self.pending.__getitem__, reverse=True)
+            del new_keys[self.capacity:]
+
+            # (count, slot) of every key, to take the slot of the lowest count once the empty slots are used
+            is_evicting = len(new_keys) > self.capacity - self.next_slot
+            lowest_slots: List[Tuple[int, int]] = []
+            if is_evicting:
+                lowest_slots = [(count, slot) for slot, count in self.slots.values()]
+                heapq.heapify(lowest_slots)
+
+            for key in new_keys:
+                count = self.pending[key]
+                if self.next_slot < self.capacity:
+                    slot = self.next_slot
+                    self.next_slot += 1
+                else:
+                    lowest_count, slot = heapq.heappop(lowest_slots)
+                    del self.slots[self.slot_keys[slot]]
+                    count += lowest_count
+                count = min(count, MAX_COUNT)
+                self.slot_keys[slot] = key
+                self.slots[key] = (slot, count)
+                written_slots[slot] = key
+                if is_evicting:
+                    heapq.heappush(lowest_slots, (count, slot))
+
+        for slot, key in sorted(written_slots.items()):
+            self.file.seek(HEADER_FORMAT.size + slot * SLOT_SIZE)
+            self.file.write(SLOT_COUNT_FORMAT.pack(self.slots[key][1]) + key)
+        self.file.seek(0)
+        self.file.write(HEADER_FORMAT.pack(MAGIC, VERSION, self.capacity, self.next_slot))
+        self.file.flush()
+
+        self.pending.clear()
+        self.pending_count = 0
+
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self.flush()
+        with self.lock:
+            self.file.close()
+
+
+    def get_counts(self) -> Dict[bytes, int]:
+        # Include the records which haven't been flushed yet
+        with self.lock:
+            counts = {key: count for key, (_, count) in self.slots.items()}
+            for key, count in self.pending.items():
+                counts[key] = counts.get(key, 0) + count
+        return counts
+
+
+    def get_hottest_keys(self, count: int) -> List[bytes]:
+        counts = self.get_counts()
+        return sorted(counts, key=counts.__getitem__, reverse=True)[:count]
+
+
+    def hottest(self, count: int) -> List[Tuple[LOGFONTW, int]]:
+        counts = self.get_counts()
+        return [(LOGFONTW.from_key(key), counts[key]) for key in sorted(counts, key=counts.__getitem__, reverse=True)[:count]]
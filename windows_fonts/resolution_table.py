@@ -0,0 +1,212 @@
+import os
+import struct
+import zlib
+from .font_catalog import FontCatalog
+from .logfont import CharacterSet, create_logfont_like_vsfilter, LOGFONT_KEY_SIZE, LOGFONTW
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .session import FontSession
+
+__all__ = [
+    "ResolutionMissError",
+    "ResolutionTable",
+    "ResolutionRecorder",
+    "ResolutionReplayer",
+]
+
+# Layout (little-endian)
+#   header            HEADER_FORMAT
+#   zlib compressed body:
+#     fingerprints    fingerprint_count * FINGERPRINT_SIZE bytes
+#     paths           path_count * (uint16 length, UTF-8 bytes)
+#     records         record_count * (RECORD_FORMAT, LOGFONTW key)
+# The LOGFONTW keys are mostly zeros, so the compression divide the size of the file by ~10.
+MAGIC = b"WFRES\x00\x00\x00"
+VERSION = 1
+HEADER_FORMAT = struct.Struct("<8sIIII")
+RECORD_FORMAT = struct.Struct("<HHI")
+STRING_LENGTH_FORMAT = struct.Struct("<H")
+FINGERPRINT_SIZE = 16
+
+
+class ResolutionMissError(KeyError):
+    pass
+
+
+class ResolutionTable():
+    # (installed font set fingerprint, LOGFONTW key) -> (path, face index). A lookup is a single dict probe.
+
+    def __init__(self) -> None:
+        self.entries: Dict[Tuple[bytes, bytes], Tuple[Path, int]] = {}
+
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+    def add(self, fingerprint: bytes, lf: LOGFONTW, path: Path, face_index: int) -> None:
+        self.entries[(fingerprint, lf.get_key())] = (Path(path), face_index)
+
+
+    def get(self, fingerprint: bytes, lf: LOGFONTW) -> Optional[Tuple[Path, int]]:
+        return self.entries.get((fingerprint, lf.get_key()))
+
+
+    def get_fingerprints(self) -> List[bytes]:
+        return list(dict.fromkeys(fingerprint for fingerprint, _ in self.entries))
+
+
+    def update(self, other: "ResolutionTable") -> None:
+        self.entries.update(other.entries)
+
+
+    def save(self, path: Path) -> None:
+        fingerprint_ids: Dict[bytes, int] = {}
+        path_ids: Dict[Path, int] = {}
+        paths = bytearray()
+        records = bytearray()
+        for (fingerprint, key), (font_path, face_index) in self.entries.items():
+            fingerprint_id = fingerprint_ids.setdefault(fingerprint, len(fingerprint_ids))
+            path_id = path_ids.get(font_path)
+            if path_id is None:
+                path_id = path_ids[font_path] = len(path_ids)
+                encoded = str(font_path).encode("utf-8")
+                paths.extend(STRING_LENGTH_FORMAT.pack(len(encoded)))
+                paths.extend(encoded)
+            records.extend(RECORD_FORMAT.pack(fingerprint_id, face_index, path_id))
+            records.extend(key)
+
+        body = b"".join(fingerprint_ids) + bytes(paths) + bytes(records)
+        header = HEADER_FORMAT.pack(MAGIC, VERSION, len(fingerprint_ids), len(path_ids), len(self.entries))
+
+        # Write next to the destination, then replace it, so a reader never load a partial file
+        temporary_path = Path(f"{path}.tmp")
+        with open(temporary_path, "wb") as file:
+            file.write(header)
+            file.write(zlib.compress(body, 9))
+        os.replace(temporary_path, path)
+
+
+    @staticmethod
+    def load(path: Path) -> "ResolutionTable":
+        data = Path(path).read_bytes()
+        if len(data) < HEADER_FORMAT.size:
+            raise ValueError(f"{path} is too small to be a resolution table")
+
+        magic, version, fingerprint_count, path_count, record_count = HEADER_FORMAT.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} isn't a resolution table")
+        if version != VERSION:
+            raise ValueError(f"{path} has the version {version}, but only the version {VERSION} is supported")
+
+        try:
+            body = zlib.decompress(data[HEADER_FORMAT.size:])
+        except zlib.error as e:
+            raise ValueError(f"{path} is corrupted") from e
+
+        offset = 0
+        fingerprints = []
+        for _ in range(fingerprint_count):
+            fingerprints.append(body[offset:offset + FINGERPRINT_SIZE])
+            offset += FINGERPRINT_SIZE
+
+        paths = []
+        for _ in range(path_count):
+            length, = STRING_LENGTH_FORMAT.unpack_from(body, offset)
+            offset += STRING_LENGTH_FORMAT.size
+            paths.append(Path(body[offset:offset + length].decode("utf-8")))
+            offset += length
+
+        if len(body) - offset != record_count * (RECORD_FORMAT.size + LOGFONT_KEY_SIZE):
+            raise ValueError(f"{path} is corrupted")
+
+        table = ResolutionTable()
+        for _ in range(record_count):
+            fingerprint_id, face_index, path_id = RECORD_FORMAT.unpack_from(body, offset)
+            offset += RECORD_FORMAT.size
+            key = body[offset:offset + LOGFONT_KEY_SIZE]
+            offset += LOGFONT_KEY_SIZE
+            table.entries[(fingerprints[fingerprint_id], key)] = (paths[path_id], face_index)
+        return table
+
+
+class ResolutionRecorder():
+    # Answer with a real FontSession (so only on Windows) and record each decision in a ResolutionTable
+
+    def __init__(self, session: Optional["FontSession"] = None, table: Optional[ResolutionTable] = None, fingerprint: Optional[bytes] = None) -> None:
+        if session is None:
+            # Imported here, so the replay doesn't need the Windows bindings
+            from .session import FontSession
+            session = FontSession()
+        self.session = session
+        self.table = table or ResolutionTable()
+        # The enumeration of every font is slow, so the fingerprint is computed once
+        self.fingerprint = fingerprint if fingerprint is not None else self.session.snapshot_catalog().get_fingerprint()
+
+
+    def get_font_face_from_logfont(self, lf: LOGFONTW) -> Tuple[Path, int]:
+        path, face_index = self.session.get_font_face_from_logfont(lf)
+        self.table.add(self.fingerprint, lf, path, face_index)
+        return (path, face_index)
+
+
+    def get_font_filepath_from_logfont(self, lf: LOGFONTW) -> Path:
+        return self.get_font_face_from_logfont(lf)[0]
+
+
+    def get_font_filepath_like_vsfilter(self, family_name: str, weight: int = 400, is_italic: bool = False, charset: CharacterSet = CharacterSet.DEFAULT_CHARSET) -> Path:
+        lf = create_logfont_like_vsfilter(family_name, weight, is_italic, charset)
+        return self.get_font_filepath_from_logfont(lf)
+
+
+    def save(self, path: Path) -> None:
+        self.table.save(path)
+
+
+class ResolutionReplayer():
+    # Answer from a recorded ResolutionTable, on any OS. A miss raise ResolutionMissError, or return None when strict is False.
+    # Every miss is counted and kept in missed_keys, so a test or a worker can report what has to be recorded.
+
+    def __init__(self, table: ResolutionTable, fingerprint: Optional[bytes] = None, strict: bool = True) -> None:
+        if fingerprint is None:
+            fingerprints = table.get_fingerprints()
+            if len(fingerprints) != 1:
+                raise ValueError(f"The table contains {len(fingerprints)} font sets, so the fingerprint must be specified")
+            fingerprint = fingerprints[0]
+
+        self.table = table
+        self.fingerprint = fingerprint
+        self.strict = strict
+        self.hits = 0
+        self.misses = 0
+        self.missed_keys: List[bytes] = []
+
+
+    @staticmethod
+    def from_catalog(table: ResolutionTable, catalog: FontCatalog, strict: bool = True) -> "ResolutionReplayer":
+        return ResolutionReplayer(table, catalog.get_fingerprint(), strict)
+
+
+    def get_font_face_from_logfont(self, lf: LOGFONTW) -> Optional[Tuple[Path, int]]:
+        font_face = self.table.get(self.fingerprint, lf)
+        if font_face is not None:
+            self.hits += 1
+            return font_face
+
+        self.misses += 1
+        self.missed_keys.append(lf.get_key())
+        if self.strict:
+            raise ResolutionMissError(f"The LOGFONTW with lfFaceName={lf.lfFaceName!r}, lfWeight={lf.lfWeight}, lfItalic={lf.lfItalic}, lfCharSet={lf.lfCharSet} hasn't been recorded")
+        return None
+
+
+    def get_font_filepath_from_logfont(self, lf: LOGFONTW) -> Optional[Path]:
+        font_face = self.get_font_face_from_logfont(lf)
+        return None if font_face is None else font_face[0]
+
+
+    def get_font_filepath_like_vsfilter(self, family_name: str, weight: int = 400, is_italic: bool = False, charset: CharacterSet = CharacterSet.DEFAULT_CHARSET) -> Optional[Path]:
+        lf = create_logfont_like_vsfilter(family_name, weight, is_italic, charset)
+        return self.get_font_filepath_from_logfont(lf)
@@ -0,0 +1,250 @@
+import threading
+from .directwrite import (
+    IDWriteFactory,
+    IDWriteFontFace,
+    IDWriteFontFile,
+    IDWriteFontFileLoader,
+    IDWriteGdiInterop,
+    IDWriteLocalFontFileLoader,
+    DirectWrite,
+)
+from .directwrite_types import DWRITE_FACTORY_TYPE
+from .font_catalog import FontCatalog, FontCatalogEntry
+from .font_dedup import FontDeduplication
+from .handles import GdiHandlePool, SelectedObject
+from .query_log import QueryLog
+from .gdi import GDI
+from .logfont import (
+    CharacterSet,
+    create_logfont_like_vsfilter,
+    ENUMLOGFONTEXW,
+    LOGFONTW,
+    TEXTMETRIC,
+)
+from collections import OrderedDict
+from ctypes import byref, create_unicode_buffer, POINTER, wintypes
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+__all__ = ["FontSession"]
+
+
+class FontSession():
+    # Keep the GDI binding, the DirectWrite factory and a pool of DCs and HFONTs alive between the queries.
+    # The resolved paths of the max_cached_fonts most recent LOGFONTW are cached, so call clear_cache() after installing or uninstalling a font.
+    # When a deduplication is given, the resolved paths are replaced by the canonical path of their content.
+    # When a query log is given, each resolved LOGFONTW is counted in it, so a new session can be warmed up with warm_up().
+
+    def __init__(self, deduplication: Optional[FontDeduplication] = None, query_log: Optional[QueryLog] = None, max_cached_fonts: int = 4096) -> None:
+        self.deduplication = deduplication
+        self.query_log = query_log
+        self.gdi = GDI()
+        self.dwrite = DirectWrite()
+
+        self.dwrite_factory = POINTER(IDWriteFactory)()
+        self.dwrite.DWriteCreateFactory(DWRITE_FACTORY_TYPE.DWRITE_FACTORY_TYPE_ISOLATED, IDWriteFactory._iid_, byref(self.dwrite_factory))
+
+        self.gdi_interop = POINTER(IDWriteGdiInterop)()
+        self.dwrite_factory.GetGdiInterop(byref(self.gdi_interop))
+
+        self.handles = GdiHandlePool(self.gdi)
+
+        self.max_cached_fonts = max_cached_fonts
+        # The warm-up thread fill the cache while the session answer other queries
+        self.cache_lock = threading.Lock()
+        self.cache: "OrderedDict[bytes, Tuple[Path, int]]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.warm_up_failures = 0
+
+
+    def __enter__(self) -> "FontSession":
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+    def close(self) -> None:
+        self.handles.close()
+
+
+    def clear_cache(self) -> None:
+        with self.cache_lock:
+            self.cache.clear()
+
+
+    @staticmethod
+    def create_logfont_like_vsfilter(family_name: str, weight: int = 400, is_italic: bool = False, charset: CharacterSet = CharacterSet.DEFAULT_CHARSET) -> LOGFONTW:
+        return create_logfont_like_vsfilter(family_name, weight, is_italic, charset)
+
+
+    def get_font_face_from_logfont(self, lf: LOGFONTW) -> Tuple[Path, int]:
+        # Return the path and the face index (in a TrueType/OpenType collection) that GDI select
+        key = lf.get_key()
+        if self.query_log is not None:
+            self.query_log.record_key(key)
+        return self._get_font_face_from_key(lf, key)
+
+
+    def _get_font_face_from_key(self, lf: LOGFONTW, key: bytes) -> Tuple[Path, int]:
+        with self.cache_lock:
+            font_face = self.cache.get(key)
+            if font_face is not None:
+                self.cache_hits += 1
+                self.cache.move_to_end(key)
+                return font_face
+            self.cache_misses += 1
+
+        path, face_index = self._resolve_logfont(lf)
+        if self.deduplication is not None:
+            path = self.deduplication.get_canonical_path(path)
+
+        with self.cache_lock:
+            self.cache[key] = (path, face_index)
+            while len(self.cache) > self.max_cached_fonts:
+                self.cache.popitem(last=False)
+        return (path, face_index)
+
+
+    def get_font_filepath_from_logfont(self, lf: LOGFONTW) -> Path:
+        return self.get_font_face_from_logfont(lf)[0]
+
+
+    def warm_up(self, keys: Iterable[bytes]) -> int:
+        # Resolve the keys into the cache without logging them. Return how many keys have been resolved.
+        # GDI substitute another face for a font which has been uninstalled since it was logged, but a key can still fail
+        # (for example, DirectWrite raise a COMError for a raster face). It must not stop the warm-up, which usually run
+        # in a background thread, so the failure is counted in warm_up_failures and the next key is resolved.
+        resolved = 0
+        for key in keys:
+            try:
+                self._get_font_face_from_key(LOGFONTW.from_key(key), key)
+            except Exception:
+                self.warm_up_failures += 1
+                continue
+            resolved += 1
+        return resolved
+
+
+    def start_warm_up(self, count: int = 1000) -> threading.Thread:
+        # Replay the hottest keys of the query log in a background thread. join() it to wait until the cache is warm.
+        if self.query_log is None:
+            raise ValueError("The session doesn't have a query log")
+        thread = threading.Thread(target=self.warm_up, args=(self.query_log.get_hottest_keys(count),), name="windows-fonts-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+
+    def get_font_filepath_like_vsfilter(self, family_name: str, weight: int = 400, is_italic: bool = False, charset: CharacterSet = CharacterSet.DEFAULT_CHARSET) -> Path:
+        lf = FontSession.create_logfont_like_vsfilter(family_name, weight, is_italic, charset)
+        return self.get_font_filepath_from_logfont(lf)
+
+
+    def get_missing_characters(self, lf: LOGFONTW, text: str) -> str:
+        # GetGlyphIndicesW work on UTF-16 code units, so the characters outside the BMP are reported as missing
+        characters = "".join(dict.fromkeys(text))
+        bmp_characters = "".join(character for character in characters if ord(character) <= 0xFFFF)
+
+        glyph_indices = (wintypes.WORD * max(1, len(bmp_characters)))()
+        with self.handles.font(lf) as hfont, self.handles.dc() as dc, SelectedObject(self.gdi, dc, hfont):
+            self.gdi.GetGlyphIndicesW(dc, bmp_characters, len(bmp_characters), glyph_indices, self.gdi.GGI_MARK_NONEXISTING_GLYPHS)
+
+        missing_glyphs = {character for character, glyph_index in zip(bmp_characters, glyph_indices) if glyph_index == 0xFFFF}
+        return "".join(character for character in characters if ord(character) > 0xFFFF or character in missing_glyphs)
+
+
+    def get_fonts(self, family_name: str, weight: int = 400, is_italic: bool = False, charset: CharacterSet = CharacterSet.DEFAULT_CHARSET) -> List[ENUMLOGFONTEXW]:
+        fonts = []
+
+        def font_enum(logfont: ENUMLOGFONTEXW, text_metric: TEXTMETRIC, font_type: wintypes.DWORD, lparam: wintypes.LPARAM):
+            fonts.append(logfont)
+            return True
+
+        lf = FontSession.create_logfont_like_vsfilter(family_name, weight, is_italic, charset)
+        self._enum_font_families(lf, font_enum)
+        return fonts
+
+
+    def get_catalog_entries(self, family_name: str, weight: int = 400, is_italic: bool = False, charset: CharacterSet = CharacterSet.DEFAULT_CHARSET) -> List[FontCatalogEntry]:
+        entries: List[FontCatalogEntry] = []
+
+        def font_enum(logfont: ENUMLOGFONTEXW, text_metric: TEXTMETRIC, font_type: wintypes.DWORD, lparam: wintypes.LPARAM):
+            entries.append(FontCatalogEntry.from_logfont(logfont, font_type))
+            return True
+
+        lf = FontSession.create_logfont_like_vsfilter(family_name, weight, is_italic, charset)
+        self._enum_font_families(lf, font_enum)
+        return FontCatalog.collapse(entries).entries
+
+
+    def snapshot_catalog(self) -> FontCatalog:
+        family_names: Dict[str, None] = {}
+        entries: List[FontCatalogEntry] = []
+
+        def family_enum(logfont: ENUMLOGFONTEXW, text_metric: TEXTMETRIC, font_type: wintypes.DWORD, lparam: wintypes.LPARAM):
+            family_names.setdefault(logfont.elfLogFont.lfFaceName, None)
+            return True
+
+        def face_enum(logfont: ENUMLOGFONTEXW, text_metric: TEXTMETRIC, font_type: wintypes.DWORD, lparam: wintypes.LPARAM):
+            # The structure is only valid during the callback, so copy it right away
+            entries.append(FontCatalogEntry.from_logfont(logfont, font_type))
+            return True
+
+        # An empty lfFaceName enumerate one face per family (and per charset)
+        lf = LOGFONTW()
+        lf.lfCharSet = CharacterSet.DEFAULT_CHARSET
+        self._enum_font_families(lf, family_enum)
+
+        for family_name in family_names:
+            lf.lfFaceName = family_name
+            self._enum_font_families(lf, face_enum)
+
+        # The files are part of the fingerprint of the catalog, so they are resolved once the enumeration is done
+        return FontCatalog(self._get_entry_with_file(entry) for entry in FontCatalog.collapse(entries))
+
+
+    def _get_entry_with_file(self, entry: FontCatalogEntry) -> FontCatalogEntry:
+        charsets = entry.charsets
+        lf = create_logfont_like_vsfilter(entry.family_name, entry.weight, entry.is_italic, charsets[0] if charsets else CharacterSet.DEFAULT_CHARSET)
+        try:
+            path, _ = self._resolve_logfont(lf)
+            return entry.with_file(path)
+        except Exception:
+            # DirectWrite can't open a raster face, so its file stay unknown
+            return entry
+
+
+    def _enum_font_families(self, lf: LOGFONTW, callback: Callable[[ENUMLOGFONTEXW, TEXTMETRIC, wintypes.DWORD, wintypes.LPARAM], bool]) -> None:
+        with self.handles.dc() as dc:
+            self.gdi.EnumFontFamiliesExW(dc, byref(lf), self.gdi.ENUMFONTFAMEXPROC(callback), 0, 0)
+
+
+    def _resolve_logfont(self, lf: LOGFONTW) -> Tuple[Path, int]:
+        # The HFONT and the DC go back to the pool (and the HFONT is unselected) even if a DirectWrite call fails
+        with self.handles.font(lf) as hfont, self.handles.dc() as dc, SelectedObject(self.gdi, dc, hfont):
+            font_face = POINTER(IDWriteFontFace)()
+            self.gdi_interop.CreateFontFaceFromHdc(dc, byref(font_face))
+
+        face_index = font_face.GetIndex()
+
+        font_files = POINTER(IDWriteFontFile)()
+        font_face.GetFiles(byref(wintypes.UINT(1)), byref(font_files))
+
+        font_file_reference_key = wintypes.LPCVOID()
+        font_file_reference_key_size = wintypes.UINT()
+        font_files.GetReferenceKey(byref(font_file_reference_key), byref(font_file_reference_key_size))
+
+        loader = POINTER(IDWriteFontFileLoader)()
+        font_files.GetLoader(byref(loader))
+
+        local_loader = loader.QueryInterface(IDWriteLocalFontFileLoader)
+
+        path_len = wintypes.UINT()
+        local_loader.GetFilePathLengthFromKey(font_file_reference_key, font_file_reference_key_size, byref(path_len))
+
+        buffer = create_unicode_buffer(path_len.value + 1)
+        local_loader.GetFilePathFromKey(font_file_reference_key, font_file_reference_key_size, buffer, len(buffer))
+
+        return (Path(buffer.value), face_index)
@@ -0,0 +1,74 @@
+import struct
+from mmap import mmap
+from typing import Dict, List, Optional, Tuple, Union
+
+__all__ = [
+    "get_face_offsets",
+    "SfntFace",
+]
+
+# https://learn.microsoft.com/en-us/typography/opentype/spec/otff
+TTC_TAG = b"ttcf"
+SFNT_VERSIONS = (b"\x00\x01\x00\x00", b"OTTO", b"true", b"typ1")
+
+
+def get_face_offsets(data: Union[bytes, bytearray, memoryview, mmap]) -> List[int]:
+    if len(data) < 12:
+        raise ValueError("The data is too small to be a font")
+
+    if bytes(data[:4]) == TTC_TAG:
+        face_count, = struct.unpack_from(">I", data, 8)
+        return list(struct.unpack_from(f">{face_count}I", data, 12))
+
+    if bytes(data[:4]) not in SFNT_VERSIONS:
+        raise ValueError(f"The data doesn't start with a known sfnt version. It start with {bytes(data[:4])!r}")
+    return [0]
+
+
+class SfntFace():
+    # View over one face of a TrueType/OpenType file (or of a collection). The data can be a mmap, nothing is copied.
+    # Only get_table() export a buffer, so a mmap can be closed as long as its result has been released. read_table() return a copy.
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview, mmap], face_index: int = 0) -> None:
+        offsets = get_face_offsets(data)
+        if not 0 <= face_index < len(offsets):
+            raise ValueError(f"The face index {face_index} doesn't exist. The font contain {len(offsets)} face(s)")
+
+        self.data = data
+        self.face_index = face_index
+        self.offset = offsets[face_index]
+
+        # https://learn.microsoft.com/en-us/typography/opentype/spec/otff#table-directory
+        table_count, = struct.unpack_from(">H", self.data, self.offset + 4)
+        self.tables: Dict[str, Tuple[int, int]] = {}
+        for i in range(table_count):
+            tag, _, table_offset, table_length = struct.unpack_from(">4sIII", self.data, self.offset + 12 + i * 16)
+            if table_offset + table_length > len(self.data):
+                raise ValueError(f"The table {tag!r} is outside of the font data")
+            self.tables[tag.decode("latin-1")] = (table_offset, table_length)
+
+
+    def has_table(self, tag: str) -> bool:
+        return tag in self.tables
+
+
+    def get_table(self, tag: str) -> Optional[memoryview]:
+        if tag not in self.tables:
+            return None
+        table_offset, table_length = self.tables[tag]
+        return memoryview(self.data)[table_offset:table_offset + table_length]
+
+
+    def read_table(self, tag: str) -> Optional[bytes]:
+        # Copy the table, so nothing keep a reference to the data (a mmap can then be closed at any time)
+        if tag not in self.tables:
+            return None
+        table_offset, table_length = self.tables[tag]
+        return bytes(self.data[table_offset:table_offset + table_length])
+
+
+    def get_head_checksum_adjustment(self) -> Optional[int]:
+        # https://learn.microsoft.com/en-us/typography/opentype/spec/head
+        if "head" not in self.tables or self.tables["head"][1] < 12:
+            return None
+        return struct.unpack_from(">I", self.data, self.tables["head"][0] + 8)[0]
@@ -0,0 +1,273 @@
+import mmap
+import struct
+from .sfnt import SfntFace
+from array import array
+from collections import OrderedDict
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+__all__ = [
+    "FontMetrics",
+    "TextMeasurer",
+]
+
+
+def decode_cmap(cmap: bytes) -> Dict[int, int]:
+    # https://learn.microsoft.com/en-us/typography/opentype/spec/cmap
+    # Like GDI, prefer the Unicode full repertoire subtable, then the Unicode BMP one, then the Symbol one.
+    _, subtable_count = struct.unpack_from(">HH", cmap, 0)
+    subtables: Dict[Tuple[int, int], int] = {}
+    for i in range(subtable_count):
+        platform_id, encoding_id, offset = struct.unpack_from(">HHI", cmap, 4 + i * 8)
+        subtables.setdefault((platform_id, encoding_id), offset)
+
+    for key in ((3, 10), (0, 6), (0, 4), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0), (3, 0)):
+        offset = subtables.get(key)
+        if offset is None:
+            continue
+        subtable_format, = struct.unpack_from(">H", cmap, offset)
+        if subtable_format == 4:
+            mapping = decode_cmap_format_4(cmap, offset)
+        elif subtable_format == 12:
+            mapping = decode_cmap_format_12(cmap, offset)
+        else:
+            continue
+
+        if key == (3, 0):
+            # The symbol fonts map their characters to U+F020..U+F0FF. GDI also accept U+0020..U+00FF for them.
+            for codepoint in range(0x20, 0x100):
+                if 0xF000 + codepoint in mapping:
+                    mapping.setdefault(codepoint, mapping[0xF000 + codepoint])
+        return mapping
+    return {}
+
+
+def decode_cmap_format_4(cmap: bytes, offset: int) -> Dict[int, int]:
+    segment_count = struct.unpack_from(">H", cmap, offset + 6)[0] // 2
+    end_codes_offset = offset + 14
+    start_codes_offset = end_codes_offset + segment_count * 2 + 2
+    id_deltas_offset = start_codes_offset + segment_count * 2
+    id_range_offsets_offset = id_deltas_offset + segment_count * 2
+
+    end_codes = struct.unpack_from(f">{segment_count}H", cmap, end_codes_offset)
+    start_codes = struct.unpack_from(f">{segment_count}H", cmap, start_codes_offset)
+    id_deltas = struct.unpack_from(f">{segment_count}h", cmap, id_deltas_offset)
+    id_range_offsets = struct.unpack_from(f">{segment_count}H", cmap, id_range_offsets_offset)
+
+    mapping: Dict[int, int] = {}
+    for i in range(segment_count):
+        start_code, end_code, id_delta, id_range_offset = start_codes[i], end_codes[i], id_deltas[i], id_range_offsets[i]
+        if start_code == 0xFFFF:
+            continue
+        for codepoint in range(start_code, end_code + 1):
+            if id_range_offset == 0:
+                glyph = (codepoint + id_delta) & 0xFFFF
+            else:
+                glyph_offset = id_range_offsets_offset + i * 2 + id_range_offset + (codepoint - start_code) * 2
+                if glyph_offset + 2 > len(cmap):
+                    continue
+                glyph, = struct.unpack_from(">H", cmap, glyph_offset)
+                if glyph:
+                    glyph = (glyph + id_delta) & 0xFFFF
+            if glyph:
+                mapping[codepoint] = glyph
+    return mapping
+
+
+def decode_cmap_format_12(cmap: bytes, offset: int) -> Dict[int, int]:
+    group_count, = struct.unpack_from(">I", cmap, offset + 12)
+    mapping: Dict[int, int] = {}
+    for i in range(group_count):
+        start_code, end_code, start_glyph = struct.unpack_from(">III", cmap, offset + 16 + i * 12)
+        for codepoint in range(start_code, min(end_code, 0x10FFFF) + 1):
+            mapping[codepoint] = start_glyph + codepoint - start_code
+    return mapping
+
+
+def decode_kern(kern: bytes) -> Dict[Tuple[int, int], int]:
+    # https://learn.microsoft.com/en-us/typography/opentype/spec/kern
+    # Only the horizontal format 0 subtables of the Windows version are used, like GDI does.
+    pairs: Dict[Tuple[int, int], int] = {}
+    version, subtable_count = struct.unpack_from(">HH", kern, 0)
+    if version != 0:
+        return pairs
+
+    offset = 4
+    for _ in range(subtable_count):
+        _, length, coverage = struct.unpack_from(">HHH", kern, offset)
+        is_horizontal = coverage & 0x1
+        is_minimum = coverage & 0x2
+        is_cross_stream = coverage & 0x4
+        is_override = coverage & 0x8
+        if coverage >> 8 == 0 and is_horizontal and not is_minimum and not is_cross_stream:
+            pair_count, = struct.unpack_from(">H", kern, offset + 6)
+            for i in range(pair_count):
+                left, right, value = struct.unpack_from(">HHh", kern, offset + 14 + i * 6)
+                pairs[(left, right)] = value if is_override else pairs.get((left, right), 0) + value
+        offset += length
+    return pairs
+
+
+class FontMetrics():
+    # The tables of one face, decoded the first time they are needed
+
+    def __init__(self, path: Path, face_index: int = 0) -> None:
+        self.path = Path(path)
+        self.face_index = face_index
+        with open(self.path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.face = SfntFace(self.data, face_index)
+        except Exception:
+            # The caller never get the object, so nobody could close the mapping (and, on Windows, the file stay locked)
+            self.data.close()
+            raise
+
+        self._units_per_em: Optional[int] = None
+        self._advances: Optional[array] = None
+        self._cmap: Optional[Dict[int, int]] = None
+        self._kerning: Optional[Dict[Tuple[int, int], int]] = None
+
+
+    def close(self) -> None:
+        self.data.close()
+
+
+    def _read_required_table(self, tag: str) -> bytes:
+        table = self.face.read_table(tag)
+        if table is None:
+            raise ValueError(f"The font {self.path} doesn't have a {tag} table")
+        return table
+
+
+    @property
+    def units_per_em(self) -> int:
+        if self._units_per_em is None:
+            # https://learn.microsoft.com/en-us/typography/opentype/spec/head
+            self._units_per_em, = struct.unpack_from(">H", self._read_required_table("head"), 18)
+        return self._units_per_em
+
+
+    @property
+    def advances(self) -> array:
+        if self._advances is None:
+            # https://learn.microsoft.com/en-us/typography/opentype/spec/hmtx
+            metric_count, = struct.unpack_from(">H", self._read_required_table("hhea"), 34)
+            glyph_count, = struct.unpack_from(">H", self._read_required_table("maxp"), 4)
+            hmtx = self._read_required_table("hmtx")
+            advances = array("H", struct.unpack_from(f">{metric_count * 2}H", hmtx, 0)[::2])
+            # The glyphs after the last long metric have the same advance as it
+            if metric_count < glyph_count:
+                advances.extend(repeat(advances[-1], glyph_count - metric_count))
+            self._advances = advances
+        return self._advances
+
+
+    @property
+    def cmap(self) -> Dict[int, int]:
+        if self._cmap is None:
+            self._cmap = decode_cmap(self._read_required_table("cmap"))
+        return self._cmap
+
+
+    @property
+    def kerning(self) -> Dict[Tuple[int, int], int]:
+        if self._kerning is None:
+            kern = self.face.read_table("kern")
+            self._kerning = {} if kern is None else decode_kern(kern)
+        return self._kerning
+
+
+    def get_character_advances(self, characters: Iterable[str]) -> Dict[str, int]:
+        # The missing characters use the advance of the .notdef glyph
+        advances = self.advances
+        cmap = self.cmap
+        result = {}
+        for character in characters:
+            glyph = cmap.get(ord(character), 0)
+            result[character] = advances[glyph] if glyph < len(advances) else advances[-1]
+        return result
+
+
+    def get_character_kerning(self, characters: Set[str]) -> Dict[Tuple[str, str], int]:
+        # Return the kerning pairs between the given characters
+        kerning = self.kerning
+        if not kerning:
+            return {}
+
+        characters_by_glyph: Dict[int, List[str]] = {}
+        for character in characters:
+            characters_by_glyph.setdefault(self.cmap.get(ord(character), 0), []).append(character)
+
+        result = {}
+        for (left, right), value in kerning.items():
+            if left in characters_by_glyph and right in characters_by_glyph:
+                for left_character in characters_by_glyph[left]:
+                    for right_character in characters_by_glyph[right]:
+                        result[(left_character, right_character)] = value
+        return result
+
+
+class TextMeasurer():
+    # Measure advance widths without any HDC. The widths are in the same unit as font_size, which is the em size (like a negative lfHeight).
+
+    def __init__(self, max_faces: int = 32) -> None:
+        self.max_faces = max_faces
+        self.metrics: "OrderedDict[Tuple[Path, int], FontMetrics]" = OrderedDict()
+
+
+    def __enter__(self) -> "TextMeasurer":
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+    def close(self) -> None:
+        for metrics in self.metrics.values():
+            metrics.close()
+        self.metrics.clear()
+
+
+    def get_metrics(self, path: Path, face_index: int = 0) -> FontMetrics:
+        key = (Path(path), face_index)
+        metrics = self.metrics.get(key)
+        if metrics is not None:
+            self.metrics.move_to_end(key)
+            return metrics
+
+        metrics = FontMetrics(path, face_index)
+        self.metrics[key] = metrics
+        while len(self.metrics) > self.max_faces:
+            _, evicted = self.metrics.popitem(last=False)
+            evicted.close()
+        return metrics
+
+
+    def measure_many(self, path: Path, texts: List[str], font_size: float, face_index: int = 0, kerning: bool = True) -> List[float]:
+        # Every distinct character (and kerning pair) of the batch is looked up once, then each text is a sum over dictionaries
+        metrics = self.get_metrics(path, face_index)
+        characters = set().union(*texts) if texts else set()
+        advances = metrics.get_character_advances(characters)
+        character_kerning = metrics.get_character_kerning(characters) if kerning else {}
+        scale = font_size / metrics.units_per_em
+
+        widths = []
+        for text in texts:
+            width = sum(map(advances.__getitem__, text))
+            if character_kerning:
+                width += sum(map(character_kerning.get, zip(text, text[1:]), repeat(0)))
+            widths.append(width * scale)
+        return widths
+
+
+    def measure(self, path: Path, text: str, font_size: float, face_index: int = 0, kerning: bool = True) -> float:
+        return self.measure_many(path, [text], font_size, face_index, kerning)[0]
+
+
+    def find_overflowing_lines(self, path: Path, lines: List[str], font_size: float, max_width: float, face_index: int = 0, kerning: bool = True) -> List[int]:
+        # Return the index of the lines which are wider than max_width (for example the width of the safe area)
+        widths = self.measure_many(path, lines, font_size, face_index, kerning)
+        return [index for index, width in enumerate(widths) if width > max_width]
@@ -12,4 +12,12 @@ class User32():
 
         self.SendMessageW = user32.SendMessageW
         self.SendMessageW.restype = wintypes.LONG
-        self.SendMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
\ No newline at end of file
+        self.SendMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+
+        # https://learn.microsoft.com/en-us/windows/win32/api/winuser/nf-winuser-getguiresources
+        self.GR_GDIOBJECTS = 0
+        self.GR_USEROBJECTS = 1
+        self.GR_GDIOBJECTS_PEAK = 2
+        self.GetGuiResources = user32.GetGuiResources
+        self.GetGuiResources.restype = wintypes.DWORD
+        self.GetGuiResources.argtypes = [wintypes.HANDLE, wintypes.DWORD]
\ No newline at end of file